@@ -1,13 +1,63 @@
-from agents.research_paper_finder import ResearchPaperFinder
-from agents.research_paper_analyst import ResearchPaperAnalyst
-from agents.seed_idea_generator import SeedIdeaGenerator
-from agents.idea_refinement_specialist import IdeaRefinementSpecialist
-from agents.research_proposal_developer import ResearchProposalDeveloper
-
-__all__ = [
-    'ResearchPaperFinder',
-    'ResearchPaperAnalyst',
-    'SeedIdeaGenerator',
-    'IdeaRefinementSpecialist',
-    'ResearchProposalDeveloper'
-]
\ No newline at end of file
+import importlib
+import os
+
+# Agent classes are imported on first attribute access so that importing the
+# package does not pull in crewai and the LLM client for every agent up front.
+_LAZY = {
+    'ResearchPaperFinder': ('agents.research_paper_finder', 'ResearchPaperFinder'),
+    'ResearchPaperAnalyst': ('agents.research_paper_analyst', 'ResearchPaperAnalyst'),
+    'SeedIdeaGenerator': ('agents.seed_idea_generator', 'SeedIdeaGenerator'),
+    'IdeaRefinementSpecialist': ('agents.idea_refinement_specialist', 'IdeaRefinementSpecialist'),
+    'ResearchProposalDeveloper': ('agents.research_proposal_developer', 'ResearchProposalDeveloper'),
+}
+
+__all__ = list(_LAZY) + ['build_all']
+
+
+def __getattr__(name):
+    try:
+        module_name, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    obj = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+def build_all(max_workers=5):
+    """
+    Create every agent concurrently.
+
+    Agent construction is independent per agent and mostly I/O-bound, so
+    the factories are run in a thread pool and the total setup time is
+    that of the slowest agent rather than the sum.
+
+    Args:
+        max_workers (int, optional): Maximum number of worker threads
+
+    Returns:
+        dict: Mapping of agent class name to the created CrewAI agent
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from agents.base_agent import _get_llm
+    from models import LLM_TIERS
+
+    # Create the LLM of every tier up front, so the workers neither contend on
+    # the import lock nor build the same tier's LLM concurrently
+    for tier in LLM_TIERS:
+        _get_llm(tier)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {name: executor.submit(lambda n=name: __getattr__(n).create()) for name in _LAZY}
+        return {name: future.result() for name, future in futures.items()}
+
+
+# Set AGENTS_EAGER_IMPORT=1 (e.g. in CI) to surface import errors at package load
+if os.getenv("AGENTS_EAGER_IMPORT", "").lower() in ("1", "true"):
+    for _name in _LAZY:
+        __getattr__(_name)
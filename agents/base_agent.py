@@ -1,15 +1,52 @@
-from crewai import Agent
-from models import llm
 import logging
 
+from config.settings import AGENT_VERBOSE, AGENTS_CACHE
+
 logger = logging.getLogger(__name__)
 
+# Shared empty tool collection for agents without tools
+_NO_TOOLS = ()
+
+# LLMs are resolved on first use; importing crewai and the model client is
+# the bulk of agent start-up cost, so it is deferred until an agent is built.
+_llms = {}
+
+
+def _get_llm(tier="smart"):
+    """Return the shared LLM instance for a capability tier, importing it on first use."""
+    if tier not in _llms:
+        from models import get_llm
+        if not _llms and AGENTS_CACHE == "exact":
+            _enable_response_cache()
+        _llms[tier] = get_llm(tier)
+    return _llms[tier]
+
+
+def _enable_response_cache():
+    """
+    Cache LLM completions in memory, keyed on the full request.
+
+    CrewAI sends completions through litellm, which hashes the model,
+    messages and parameters of each call; an identical request (same
+    system prompt, task description and tool results) is then served from
+    memory instead of calling the API again.
+    """
+    try:
+        import litellm
+        litellm.enable_cache()
+        logger.info("Enabled in-memory LLM response cache")
+    except Exception as e:
+        logger.warning("Could not enable LLM response cache: %s", e)
+
 
 class BaseAgent:
     """Base agent class with common functionality for all agents."""
 
+    __slots__ = ()
+
     @staticmethod
-    def create(name, role, goal, backstory, tools=None, system_prompt=None, verbose=True):
+    def create(name, role, goal, backstory, tools=None, system_prompt=None, verbose=None,
+               system_prompt_version=None, llm_tier="smart"):
         """
         Factory method to create a CrewAI agent with consistent configuration.
 
@@ -20,13 +57,22 @@ class BaseAgent:
             backstory (str): The agent's backstory
             tools (list, optional): List of tools available to the agent
             system_prompt (str, optional): Custom system prompt for the agent
-            verbose (bool, optional): Whether to enable verbose logging
+            verbose (bool, optional): Whether to enable verbose logging.
+                Defaults to AGENT_VERBOSE (set via the CREWAI_VERBOSE env variable)
+            system_prompt_version (str, optional): Content hash of the system prompt,
+                logged so runs can be traced back to the prompt revision used
+            llm_tier (str, optional): Capability tier of the agent's LLM, see models.LLM_TIERS
 
         Returns:
             Agent: A configured CrewAI agent
         """
+        if verbose is None:
+            verbose = AGENT_VERBOSE
+
         try:
-            logger.info(f"Creating agent: {name}")
+            from crewai import Agent
+
+            logger.info("Creating agent: %s (system prompt %s)", name, system_prompt_version or "n/a")
 
             # Create the agent with the provided parameters
             agent = Agent(
@@ -35,14 +81,14 @@ class BaseAgent:
                 goal=goal,
                 backstory=backstory,
                 verbose=verbose,
-                llm=llm,
-                tools=tools or [],
+                llm=_get_llm(llm_tier),
+                tools=tools if tools else _NO_TOOLS,
                 system_prompt=system_prompt
             )
 
-            logger.info(f"Successfully created agent: {name}")
+            logger.info("Successfully created agent: %s", name)
             return agent
 
         except Exception as e:
-            logger.error(f"Error creating agent {name}: {str(e)}")
-            raise
\ No newline at end of file
+            logger.error("Error creating agent %s: %s", name, e)
+            raise
@@ -1,31 +1,45 @@
+import functools
+from types import MappingProxyType
+
 from agents.base_agent import BaseAgent
-from utils.helpers import load_prompt_template
+from utils.helpers import load_prompt_template, prompt_version
+
+
+_CFG = MappingProxyType(dict(
+    name="Idea Refinement Specialist",
+    role="Idea Refinement Specialist",
+    goal="Refine and enhance generated research ideas",
+    backstory="You are an expert at improving research ideas "
+              "through critical analysis and strategic enhancement. "
+              "You evaluate ideas for scientific merit, feasibility, "
+              "and potential impact, then provide concrete suggestions "
+              "for strengthening each concept."
+))
+
+# Load the system prompt once at import, with a version id derived from its content
+_SYSTEM_PROMPT = load_prompt_template("idea_refinement_specialist")
+_SYSTEM_PROMPT_VERSION = prompt_version(_SYSTEM_PROMPT)
 
 
 class IdeaRefinementSpecialist(BaseAgent):
     """Agent responsible for refining and enhancing research ideas."""
 
+    __slots__ = ()
+
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def create():
         """
         Factory method to create an Idea Refinement Specialist agent.
 
+        The agent is built on the first call and the same instance is
+        returned on subsequent calls.
+
         Returns:
             Agent: A configured CrewAI agent for refining research ideas
         """
-        # Load the system prompt from templates
-        system_prompt = load_prompt_template("idea_refinement_specialist")
-
         return BaseAgent.create(
-            name="Idea Refinement Specialist",
-            role="Idea Refinement Specialist",
-            goal="Refine and enhance generated research ideas",
-            backstory="You are an expert at improving research ideas "
-                      "through critical analysis and strategic enhancement. "
-                      "You evaluate ideas for scientific merit, feasibility, "
-                      "and potential impact, then provide concrete suggestions "
-                      "for strengthening each concept.",
-            tools=[],  # This agent primarily uses reasoning, no specific tools needed
-            system_prompt=system_prompt,
-            verbose=True
+            **_CFG,
+            system_prompt=_SYSTEM_PROMPT,
+            system_prompt_version=_SYSTEM_PROMPT_VERSION
         )
\ No newline at end of file
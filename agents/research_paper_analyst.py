@@ -1,31 +1,47 @@
+import functools
+from types import MappingProxyType
+
 from agents.base_agent import BaseAgent
 from tools.scrape_website import scrape_website  # Import the function instead of the class
-from utils.helpers import load_prompt_template
+from utils.helpers import load_prompt_template, prompt_version
+
+
+_CFG = MappingProxyType(dict(
+    name="Research Paper Analyst",
+    role="Research Paper Analyst",
+    goal="Analyze scientific papers to extract key knowledge and limitations",
+    backstory="You are an expert at analyzing scientific papers to identify "
+              "key findings, methodologies, and limitations. You excel at "
+              "synthesizing information across multiple papers to identify "
+              "patterns, contradictions, and research gaps."
+))
+
+# Load the system prompt once at import, with a version id derived from its content
+_SYSTEM_PROMPT = load_prompt_template("research_paper_analyst")
+_SYSTEM_PROMPT_VERSION = prompt_version(_SYSTEM_PROMPT)
 
 
 class ResearchPaperAnalyst(BaseAgent):
     """Agent responsible for analyzing research papers and extracting key insights."""
 
+    __slots__ = ()
+
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def create():
         """
         Factory method to create a Research Paper Analyst agent.
 
+        The agent is built on the first call and the same instance is
+        returned on subsequent calls.
+
         Returns:
             Agent: A configured CrewAI agent for analyzing research papers
         """
-        # Load the system prompt from templates
-        system_prompt = load_prompt_template("research_paper_analyst")
-
         return BaseAgent.create(
-            name="Research Paper Analyst",
-            role="Research Paper Analyst",
-            goal="Analyze scientific papers to extract key knowledge and limitations",
-            backstory="You are an expert at analyzing scientific papers to identify "
-                      "key findings, methodologies, and limitations. You excel at "
-                      "synthesizing information across multiple papers to identify "
-                      "patterns, contradictions, and research gaps.",
+            **_CFG,
             tools=[scrape_website],  # Pass the function directly
-            system_prompt=system_prompt,
-            verbose=True
+            system_prompt=_SYSTEM_PROMPT,
+            system_prompt_version=_SYSTEM_PROMPT_VERSION,
+            llm_tier="cheap"
         )
\ No newline at end of file
@@ -1,31 +1,47 @@
+import functools
+from types import MappingProxyType
+
 from agents.base_agent import BaseAgent
 from tools.tavily_search import tavily_search  # Import the function instead of the class
-from utils.helpers import load_prompt_template
+from utils.helpers import load_prompt_template, prompt_version
+
+
+_CFG = MappingProxyType(dict(
+    name="Research Paper Finder",
+    role="Research Paper Finder",
+    goal="Find relevant scientific papers related to the input paper",
+    backstory="You are an expert at finding relevant scientific papers "
+              "related to a given research topic. You focus on recent, "
+              "high-quality papers from reputable sources and deliver "
+              "comprehensive results with accurate metadata."
+))
+
+# Load the system prompt once at import, with a version id derived from its content
+_SYSTEM_PROMPT = load_prompt_template("research_paper_finder")
+_SYSTEM_PROMPT_VERSION = prompt_version(_SYSTEM_PROMPT)
 
 
 class ResearchPaperFinder(BaseAgent):
     """Agent responsible for finding relevant research papers on a topic."""
 
+    __slots__ = ()
+
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def create():
         """
         Factory method to create a Research Paper Finder agent.
 
+        The agent is built on the first call and the same instance is
+        returned on subsequent calls.
+
         Returns:
             Agent: A configured CrewAI agent for finding research papers
         """
-        # Load the system prompt from templates
-        system_prompt = load_prompt_template("research_paper_finder")
-
         return BaseAgent.create(
-            name="Research Paper Finder",
-            role="Research Paper Finder",
-            goal="Find relevant scientific papers related to the input paper",
-            backstory="You are an expert at finding relevant scientific papers "
-                      "related to a given research topic. You focus on recent, "
-                      "high-quality papers from reputable sources and deliver "
-                      "comprehensive results with accurate metadata.",
+            **_CFG,
             tools=[tavily_search],  # Pass the function directly
-            system_prompt=system_prompt,
-            verbose=True
+            system_prompt=_SYSTEM_PROMPT,
+            system_prompt_version=_SYSTEM_PROMPT_VERSION,
+            llm_tier="cheap"
         )
\ No newline at end of file
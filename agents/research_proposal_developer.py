@@ -1,31 +1,45 @@
+import functools
+from types import MappingProxyType
+
 from agents.base_agent import BaseAgent
-from utils.helpers import load_prompt_template
+from utils.helpers import load_prompt_template, prompt_version
+
+
+_CFG = MappingProxyType(dict(
+    name="Research Proposal Developer",
+    role="Research Proposal Developer",
+    goal="Transform ideas into complete research proposals",
+    backstory="You are an expert at structuring comprehensive research "
+              "proposals with clear methodologies and expected goals. "
+              "You excel at developing formal research plans with "
+              "detailed objectives, methodologies, expected outcomes, "
+              "and resource requirements."
+))
+
+# Load the system prompt once at import, with a version id derived from its content
+_SYSTEM_PROMPT = load_prompt_template("research_proposal_developer")
+_SYSTEM_PROMPT_VERSION = prompt_version(_SYSTEM_PROMPT)
 
 
 class ResearchProposalDeveloper(BaseAgent):
     """Agent responsible for developing comprehensive research proposals."""
 
+    __slots__ = ()
+
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def create():
         """
         Factory method to create a Research Proposal Developer agent.
 
+        The agent is built on the first call and the same instance is
+        returned on subsequent calls.
+
         Returns:
             Agent: A configured CrewAI agent for developing research proposals
         """
-        # Load the system prompt from templates
-        system_prompt = load_prompt_template("research_proposal_developer")
-
         return BaseAgent.create(
-            name="Research Proposal Developer",
-            role="Research Proposal Developer",
-            goal="Transform ideas into complete research proposals",
-            backstory="You are an expert at structuring comprehensive research "
-                      "proposals with clear methodologies and expected goals. "
-                      "You excel at developing formal research plans with "
-                      "detailed objectives, methodologies, expected outcomes, "
-                      "and resource requirements.",
-            tools=[],  # This agent primarily uses reasoning, no specific tools needed
-            system_prompt=system_prompt,
-            verbose=True
+            **_CFG,
+            system_prompt=_SYSTEM_PROMPT,
+            system_prompt_version=_SYSTEM_PROMPT_VERSION
         )
\ No newline at end of file
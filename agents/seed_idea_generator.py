@@ -1,30 +1,45 @@
+import functools
+from types import MappingProxyType
+
 from agents.base_agent import BaseAgent
-from utils.helpers import load_prompt_template
+from utils.helpers import load_prompt_template, prompt_version
+
+
+_CFG = MappingProxyType(dict(
+    name="Seed Idea Generator",
+    role="Seed Idea Generator",
+    goal="Generate initial research ideas by combining knowledge from related papers",
+    backstory="You are an expert at combining knowledge from multiple "
+              "sources to generate novel research ideas. You identify gaps "
+              "in existing research and propose creative solutions that "
+              "build upon established methodologies while exploring new directions."
+))
+
+# Load the system prompt once at import, with a version id derived from its content
+_SYSTEM_PROMPT = load_prompt_template("seed_idea_generator")
+_SYSTEM_PROMPT_VERSION = prompt_version(_SYSTEM_PROMPT)
 
 
 class SeedIdeaGenerator(BaseAgent):
     """Agent responsible for generating initial research ideas."""
 
+    __slots__ = ()
+
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def create():
         """
         Factory method to create a Seed Idea Generator agent.
 
+        The agent is built on the first call and the same instance is
+        returned on subsequent calls.
+
         Returns:
             Agent: A configured CrewAI agent for generating research ideas
         """
-        # Load the system prompt from templates
-        system_prompt = load_prompt_template("seed_idea_generator")
-
         return BaseAgent.create(
-            name="Seed Idea Generator",
-            role="Seed Idea Generator",
-            goal="Generate initial research ideas by combining knowledge from related papers",
-            backstory="You are an expert at combining knowledge from multiple "
-                      "sources to generate novel research ideas. You identify gaps "
-                      "in existing research and propose creative solutions that "
-                      "build upon established methodologies while exploring new directions.",
-            tools=[],  # This agent primarily uses reasoning, no specific tools needed
-            system_prompt=system_prompt,
-            verbose=True
+            **_CFG,
+            system_prompt=_SYSTEM_PROMPT,
+            system_prompt_version=_SYSTEM_PROMPT_VERSION,
+            llm_tier="creative"
         )
\ No newline at end of file
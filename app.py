@@ -1,35 +1,53 @@
 import streamlit as st
+import io
 import os
-import json
-import time
-import smtplib
+import re
+import html
+import orjson
+import atexit
 import logging
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
 from dotenv import load_dotenv
 import threading
+from concurrent.futures import ThreadPoolExecutor
+import queue
 import uuid
+import zipfile
 import pandas as pd
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Import our research proposal generation system
 from main import main as generate_proposals
-from utils.helpers import validate_json_output
-
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("streamlit_app.log"),
-        logging.StreamHandler()
-    ]
-)
+from utils.helpers import clean_filename, validate_json_output
+from utils.email_utils import SMTPConnection
+
+@st.cache_resource
+def bootstrap():
+    """
+    Load environment variables and configure logging once per server process.
+
+    Streamlit re-executes this script on every interaction; caching keeps the
+    .env file from being re-read and the log file from being reopened each time.
+    """
+    # Load environment variables
+    load_dotenv()
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("streamlit_app.log"),
+            logging.StreamHandler()
+        ]
+    )
+
+    return logging.getLogger(__name__)
 
-logger = logging.getLogger(__name__)
+
+logger = bootstrap()
 
 # Email Configuration
 EMAIL_SENDER = os.getenv("EMAIL_SENDER", "")
@@ -46,7 +64,7 @@ st.set_page_config(
 )
 
 # Define CSS for better styling
-st.markdown("""
+CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -90,14 +108,81 @@ st.markdown("""
         margin-bottom: 1.5rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+@st.cache_resource
+def minified_css():
+    """Return the stylesheet with whitespace collapsed, computed once per server process."""
+    return re.sub(r"\s*([{}:;])\s*", r"\1", " ".join(CSS.split()))
+
+
+# Elements are cleared on every rerun, so the stylesheet is re-emitted each time
+st.markdown(minified_css(), unsafe_allow_html=True)
+
+
+@st.cache_resource
+def get_smtp_connection():
+    """Return the process-wide SMTP connection, shared across reruns and sessions."""
+    connection = SMTPConnection(SMTP_SERVER, SMTP_PORT, EMAIL_SENDER, EMAIL_PASSWORD)
+    atexit.register(connection.close)
+    return connection
+
+
+@st.cache_resource
+def get_mail_pool():
+    """Return the process-wide executor used to send result emails in the background."""
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mail")
+    atexit.register(pool.shutdown)
+    return pool
+
+
+def format_proposal_email_html(proposal, index):
+    """
+    Render one proposal as an HTML block for the results email.
+
+    Args:
+        proposal (dict): Research proposal dictionary
+        index (int): 1-based position of the proposal, used for the fallback title
+
+    Returns:
+        str: HTML fragment with all proposal text escaped
+    """
+    title = html.escape(str(proposal.get("proposal_title", f"Proposal {index}")))
+    introduction = html.escape(str(proposal.get("introduction", "No introduction provided")))
+    methodology = html.escape(str(proposal.get("methodology", "No methodology provided"))[:500])
+    outcomes = html.escape(str(proposal.get("expected_outcomes", "No outcomes specified"))[:500])
+
+    # Format research questions
+    questions_html = "".join(f"<li>{html.escape(str(q))}</li>" for q in proposal.get("research_questions", []))
+
+    return f"""
+            <div style="margin-bottom: 30px; border: 1px solid #ccc; padding: 20px; border-radius: 5px;">
+                <h2 style="color: #1E3A8A;">{title}</h2>
+                <h3>Introduction</h3>
+                <p>{introduction}</p>
 
+                <h3>Research Questions</h3>
+                <ul>{questions_html}</ul>
+
+                <h3>Methodology</h3>
+                <p>{methodology}...</p>
 
-def send_email_with_proposals(recipient_email, proposals, session_id):
+                <h3>Expected Outcomes</h3>
+                <p>{outcomes}...</p>
+            </div>
+            """
+
+
+def send_email_with_proposals(connection, recipient_email, proposals, session_id):
     """
     Send email with research proposals as HTML content.
 
+    Runs on the mail pool, whose threads have no Streamlit script context, so
+    the shared connection is resolved by the caller and passed in.
+
     Args:
+        connection (SMTPConnection): Shared connection returned by get_smtp_connection
         recipient_email (str): Email address to send to
         proposals (list): List of research proposal dictionaries
         session_id (str): Unique session identifier
@@ -116,36 +201,8 @@ def send_email_with_proposals(recipient_email, proposals, session_id):
         msg['To'] = recipient_email
         msg['Subject'] = f"Research Proposals Generated - Session {session_id[:8]}"
 
-        # Create HTML for each proposal
-        proposals_html = ""
-        for i, proposal in enumerate(proposals, 1):
-            title = proposal.get("proposal_title", f"Proposal {i}")
-            introduction = proposal.get("introduction", "No introduction provided")
-            methodology = proposal.get("methodology", "No methodology provided")
-            outcomes = proposal.get("expected_outcomes", "No outcomes specified")
-
-            # Format research questions
-            questions_html = "<ul>"
-            for q in proposal.get("research_questions", []):
-                questions_html += f"<li>{q}</li>"
-            questions_html += "</ul>"
-
-            proposals_html += f"""
-            <div style="margin-bottom: 30px; border: 1px solid #ccc; padding: 20px; border-radius: 5px;">
-                <h2 style="color: #1E3A8A;">{title}</h2>
-                <h3>Introduction</h3>
-                <p>{introduction}</p>
-
-                <h3>Research Questions</h3>
-                {questions_html}
-
-                <h3>Methodology</h3>
-                <p>{methodology[:500]}...</p>
-
-                <h3>Expected Outcomes</h3>
-                <p>{outcomes[:500]}...</p>
-            </div>
-            """
+        # Create HTML for each proposal; model output is escaped before it goes into the markup
+        proposals_html = "".join(format_proposal_email_html(proposal, i) for i, proposal in enumerate(proposals, 1))
 
         # Email body
         body = f"""
@@ -168,11 +225,8 @@ def send_email_with_proposals(recipient_email, proposals, session_id):
 
         msg.attach(MIMEText(body, 'html'))
 
-        # Send email
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(EMAIL_SENDER, EMAIL_PASSWORD)
-            server.send_message(msg)
+        # Send email over the shared connection
+        connection.send_message(msg)
 
         logger.info(f"Email sent successfully to {recipient_email}")
         return True
@@ -182,42 +236,215 @@ def send_email_with_proposals(recipient_email, proposals, session_id):
         return False
 
 
-def run_proposal_generation(input_paper, recipient_email, session_id):
+# Pipeline stages in execution order, as reported by the on_stage callback
+STAGES = ["paper_finding", "paper_analysis", "idea_generation", "idea_refinement", "proposal_development"]
+
+
+@st.cache_data(show_spinner=False, ttl=24 * 60 * 60)
+def _cached_generate(input_paper, session_id, _on_stage=None):
+    """
+    Run the proposal pipeline, memoized on the input paper and session.
+
+    Streamlit reruns the whole script on every widget interaction, so the
+    result is cached to keep tab switches and selections from re-running
+    the pipeline. The stage callback is not part of the cache key.
+    """
+    return generate_proposals(input_paper, f"output_{session_id}", on_stage=_on_stage)
+
+
+def run_proposal_generation(input_paper, recipient_email, session_id, events, smtp_connection=None):
     """
     Run the research proposal generation process in a separate thread.
 
+    The worker never touches Streamlit directly; progress is reported as
+    (kind, payload) events on the queue, which the status fragment drains
+    on the script thread.
+
     Args:
         input_paper (str): Title of the input paper
         recipient_email (str): Email to send results to
         session_id (str): Unique session identifier
+        events (queue.Queue): Queue receiving progress events
+        smtp_connection (SMTPConnection, optional): Connection used to email the results
     """
     try:
-        # Update session state
-        st.session_state.current_stage = "paper_finding"
-        st.session_state.status = "running"
-        st.session_state.progress = 10
-        time.sleep(1)  # Let the UI update
+        # Run the main process; output is written to a per-session directory
+        proposals = _cached_generate(
+            input_paper, session_id,
+            _on_stage=lambda stage, result: events.put(("stage", (stage, result)))
+        )
+        events.put(("complete", proposals))
+
+        # Send email with results if email is provided, without holding up this worker
+        if recipient_email:
+            future = get_mail_pool().submit(
+                send_email_with_proposals, smtp_connection, recipient_email, proposals, session_id
+            )
+            future.add_done_callback(lambda f: events.put(("email", f.result())))
+
+    except Exception as e:
+        logger.error(f"Error in proposal generation: {str(e)}", exc_info=True)
+        events.put(("error", str(e)))
+
+
+def drain_events():
+    """Apply queued worker events to session state."""
+    events = st.session_state.events
+    while True:
+        try:
+            kind, payload = events.get_nowait()
+        except queue.Empty:
+            break
+
+        if kind == "stage":
+            stage, result = payload
+            st.session_state.stage_results[stage] = result
+            index = STAGES.index(stage) + 1
+            st.session_state.current_stage = STAGES[index] if index < len(STAGES) else stage
+        elif kind == "complete":
+            st.session_state.proposals = payload
+            st.session_state.status = "complete"
+            st.session_state.progress = 100
+        elif kind == "email":
+            st.session_state.email_sent = payload
+        elif kind == "error":
+            st.session_state.status = "error"
+            st.session_state.error_message = payload
+
+
+def status_fragment():
+    """
+    Show the generation status, applying any events queued by the worker.
+
+    While the worker is active this runs as a polling fragment, so only the
+    status box reruns; when the run finishes the whole app is rerun so the
+    results are rendered.
+    """
+    previous_status = st.session_state.status
+    drain_events()
+
+    if st.session_state.status != previous_status:
+        st.rerun(scope="app")
+
+    recipient_email = st.session_state.recipient_email
+
+    # Status indicator and progress bar
+    if st.session_state.status == "idle":
+        st.info("Enter a research paper title and click 'Generate Proposals' to start.")
+
+    elif st.session_state.status == "running":
+        # Determine progress based on current stage
+        progress_map = {
+            "paper_finding": 20,
+            "paper_analysis": 40,
+            "idea_generation": 60,
+            "idea_refinement": 80,
+            "proposal_development": 90
+        }
+        current_progress = progress_map.get(st.session_state.current_stage, st.session_state.progress)
+
+        # Update progress in session state
+        st.session_state.progress = max(st.session_state.progress, current_progress)
+
+        # Display stage-specific message
+        stage_messages = {
+            "paper_finding": "Finding relevant research papers...",
+            "paper_analysis": "Analyzing research papers...",
+            "idea_generation": "Generating initial research ideas...",
+            "idea_refinement": "Refining research ideas...",
+            "proposal_development": "Developing complete research proposals..."
+        }
+        current_message = stage_messages.get(st.session_state.current_stage, "Processing...")
 
-        # Generate output directory based on session ID
-        output_dir = f"output_{session_id}"
+        st.markdown(f'<div class="status-box status-running">{current_message}</div>', unsafe_allow_html=True)
+        st.progress(st.session_state.progress / 100)
 
-        # Run the main process with custom logging for UI updates
-        proposals = generate_proposals(input_paper, output_dir)
+        # Show the output of each finished stage while the later stages run
+        for stage, result in st.session_state.stage_results.items():
+            with st.expander(f"{stage.replace('_', ' ').capitalize()} output"):
+                if isinstance(result, (dict, list)):
+                    st.json(result)
+                else:
+                    st.write(str(result))
 
-        # Store results in session state
-        st.session_state.proposals = proposals
-        st.session_state.status = "complete"
-        st.session_state.progress = 100
+    elif st.session_state.status == "complete":
+        st.markdown('<div class="status-box status-complete">Proposal generation complete!</div>',
+                    unsafe_allow_html=True)
+        st.progress(1.0)
 
-        # Send email with results if email is provided
+        # Email status if email was provided
         if recipient_email:
-            email_sent = send_email_with_proposals(recipient_email, proposals, session_id)
-            st.session_state.email_sent = email_sent
+            if st.session_state.email_sent is None:
+                st.info(f"Sending proposals to {recipient_email}...")
+            elif st.session_state.email_sent:
+                st.success(f"Proposals sent to {recipient_email}")
+            else:
+                st.warning(
+                    f"Failed to send email to {recipient_email}. You can still view and download the proposals below.")
 
-    except Exception as e:
-        logger.error(f"Error in proposal generation: {str(e)}", exc_info=True)
-        st.session_state.status = "error"
-        st.session_state.error_message = str(e)
+    elif st.session_state.status == "error":
+        st.markdown('<div class="status-box status-error">Error in proposal generation!</div>', unsafe_allow_html=True)
+        st.error(st.session_state.error_message)
+
+
+@st.cache_data(show_spinner=False)
+def proposals_json(proposals):
+    """Serialize proposals for download, once per result rather than on every rerun."""
+    return orjson.dumps(proposals, option=orjson.OPT_INDENT_2).decode()
+
+
+def proposal_filename(title):
+    """Return a filesystem-safe file name stem for a proposal title."""
+    return clean_filename(title)
+
+
+@st.cache_data(show_spinner=False)
+def proposals_zip(proposals):
+    """
+    Bundle every proposal as a text file in a deflate-compressed ZIP archive.
+
+    Args:
+        proposals (list): List of research proposal dictionaries
+
+    Returns:
+        bytes: The ZIP archive
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i, proposal in enumerate(proposals, 1):
+            title = proposal.get("proposal_title", f"Proposal {i}")
+            # Prefix with the position so proposals with the same title don't collide
+            archive.writestr(f"{i:02d}_{proposal_filename(title)}.txt", format_proposal_text(proposal, title))
+    return buffer.getvalue()
+
+
+def format_proposal_text(proposal, title):
+    """
+    Format a proposal as a Markdown text document.
+
+    Args:
+        proposal (dict): Research proposal dictionary
+        title (str): Title to use for the document heading
+
+    Returns:
+        str: The formatted proposal
+    """
+    def bullets(key):
+        return "".join(f"- {item}\n" for item in proposal.get(key, []))
+
+    return "".join([
+        f"# {title}\n\n",
+        f"## Introduction\n{proposal.get('introduction', '')}\n\n",
+        f"## Research Questions\n{bullets('research_questions')}\n",
+        f"## Hypotheses\n{bullets('hypotheses')}\n",
+        f"## Methodology\n{proposal.get('methodology', '')}\n\n",
+        f"## Expected Outcomes\n{proposal.get('expected_outcomes', '')}\n\n",
+        f"## Potential Challenges\n{proposal.get('potential_challenges', '')}\n\n",
+        f"## Ethical Considerations\n{proposal.get('ethical_considerations', '')}\n\n",
+        f"## Resource Requirements\n{proposal.get('resource_requirements', '')}\n\n",
+        f"## Timeline\n{proposal.get('timeline', '')}\n\n",
+        f"## References\n{bullets('references')}",
+    ])
 
 
 def initialize_session_state():
@@ -243,6 +470,15 @@ def initialize_session_state():
     if "error_message" not in st.session_state:
         st.session_state.error_message = None
 
+    if "recipient_email" not in st.session_state:
+        st.session_state.recipient_email = ""
+
+    if "stage_results" not in st.session_state:
+        st.session_state.stage_results = {}
+
+    if "events" not in st.session_state:
+        st.session_state.events = queue.Queue()
+
 
 def main():
     """Main Streamlit application."""
@@ -276,75 +512,36 @@ def main():
     # Handle form submission
     if submit_button:
         # Reset state for new run
-        st.session_state.status = "starting"
-        st.session_state.progress = 0
+        st.session_state.status = "running"
+        st.session_state.current_stage = "paper_finding"
+        st.session_state.progress = 10
         st.session_state.proposals = None
         st.session_state.email_sent = None
         st.session_state.error_message = None
+        st.session_state.recipient_email = recipient_email
+        st.session_state.stage_results = {}
+        st.session_state.events = queue.Queue()
 
-        # Start generation in a separate thread
+        # Start generation in a separate thread; the SMTP connection is a cached
+        # resource, so it is looked up here on the script thread
         thread = threading.Thread(
             target=run_proposal_generation,
-            args=(input_paper, recipient_email, st.session_state.session_id)
+            args=(input_paper, recipient_email, st.session_state.session_id, st.session_state.events,
+                  get_smtp_connection() if recipient_email else None)
         )
         thread.daemon = True
+        # The worker calls cached Streamlit functions, which need the script run context
+        add_script_run_ctx(thread, get_script_run_ctx())
         thread.start()
 
     # Display current status
     st.markdown('<h2 class="sub-header">Generation Status</h2>', unsafe_allow_html=True)
 
-    # Status indicator and progress bar
-    if st.session_state.status == "idle":
-        st.info("Enter a research paper title and click 'Generate Proposals' to start.")
-
-    elif st.session_state.status == "starting":
-        st.markdown('<div class="status-box status-running">Starting proposal generation...</div>',
-                    unsafe_allow_html=True)
-        st.progress(0)
-
-    elif st.session_state.status == "running":
-        # Determine progress based on current stage
-        progress_map = {
-            "paper_finding": 20,
-            "paper_analysis": 40,
-            "idea_generation": 60,
-            "idea_refinement": 80,
-            "proposal_development": 90
-        }
-        current_progress = progress_map.get(st.session_state.current_stage, st.session_state.progress)
-
-        # Update progress in session state
-        st.session_state.progress = max(st.session_state.progress, current_progress)
-
-        # Display stage-specific message
-        stage_messages = {
-            "paper_finding": "Finding relevant research papers...",
-            "paper_analysis": "Analyzing research papers...",
-            "idea_generation": "Generating initial research ideas...",
-            "idea_refinement": "Refining research ideas...",
-            "proposal_development": "Developing complete research proposals..."
-        }
-        current_message = stage_messages.get(st.session_state.current_stage, "Processing...")
-
-        st.markdown(f'<div class="status-box status-running">{current_message}</div>', unsafe_allow_html=True)
-        st.progress(st.session_state.progress / 100)
-
-    elif st.session_state.status == "complete":
-        st.markdown('<div class="status-box status-complete">Proposal generation complete!</div>',
-                    unsafe_allow_html=True)
-        st.progress(1.0)
-
-        # Email status if email was provided
-        if recipient_email:
-            if st.session_state.email_sent:
-                st.success(f"Proposals sent to {recipient_email}")
-            else:
-                st.warning(
-                    f"Failed to send email to {recipient_email}. You can still view and download the proposals below.")
-
-    elif st.session_state.status == "error":
-        st.markdown('<div class="status-box status-error">Error in proposal generation!</div>', unsafe_allow_html=True)
-        st.error(st.session_state.error_message)
+    # Poll for worker events only while the pipeline or the email send is pending
+    polling = (st.session_state.status == "running"
+               or (st.session_state.status == "complete" and st.session_state.recipient_email
+                   and st.session_state.email_sent is None))
+    st.fragment(status_fragment, run_every=1.0 if polling else None)()
 
     # Display results if available
     if st.session_state.proposals:
@@ -356,19 +553,23 @@ def main():
         tab1, tab2, tab3 = st.tabs(["Proposal Cards", "Detailed View", "Download Options"])
 
         with tab1:
-            # Display proposal cards
-            for i, proposal in enumerate(proposals, 1):
-                title = proposal.get("proposal_title", f"Proposal {i}")
-                methodology = proposal.get("methodology", "No methodology provided")
-                outcomes = proposal.get("expected_outcomes", "No outcomes specified")
-
-                st.markdown(f"""
+            # Build every card in one pass and render them with a single markdown call
+            cards = pd.DataFrame(proposals).reindex(columns=["proposal_title", "methodology", "expected_outcomes"])
+            titles = cards["proposal_title"].fillna(pd.Series(
+                [f"Proposal {i}" for i in range(1, len(cards) + 1)], index=cards.index))
+            methodologies = cards["methodology"].fillna("No methodology provided").astype(str).str[:200]
+            outcomes = cards["expected_outcomes"].fillna("No outcomes specified").astype(str).str[:200]
+
+            st.markdown("\n".join(
+                f"""
                 <div class="proposal-card">
                     <h3>{title}</h3>
-                    <p><strong>Methodology:</strong> {methodology[:200]}...</p>
-                    <p><strong>Expected Outcomes:</strong> {outcomes[:200]}...</p>
+                    <p><strong>Methodology:</strong> {methodology}...</p>
+                    <p><strong>Expected Outcomes:</strong> {outcome}...</p>
                 </div>
-                """, unsafe_allow_html=True)
+                """
+                for title, methodology, outcome in zip(titles, methodologies, outcomes)
+            ), unsafe_allow_html=True)
 
         with tab2:
             # Create a selection dropdown for proposals
@@ -424,7 +625,7 @@ def main():
 
             # Download all proposals as JSON
             st.markdown("#### Download All Proposals (JSON)")
-            json_data = json.dumps(proposals, indent=2)
+            json_data = proposals_json(proposals)
             st.download_button(
                 label="Download All Proposals (JSON)",
                 data=json_data,
@@ -432,45 +633,29 @@ def main():
                 mime="application/json",
             )
 
-            # Download each proposal as text
-            st.markdown("#### Download Individual Proposals (Text)")
-            for i, proposal in enumerate(proposals, 1):
-                title = proposal.get("proposal_title", f"Proposal {i}")
-                # Create clean filename
-                filename = "".join(c if c.isalnum() else "_" for c in title).lower()
-
-                # Format proposal as text
-                proposal_text = f"# {title}\n\n"
-                proposal_text += f"## Introduction\n{proposal.get('introduction', '')}\n\n"
-
-                proposal_text += "## Research Questions\n"
-                for q in proposal.get("research_questions", []):
-                    proposal_text += f"- {q}\n"
-                proposal_text += "\n"
-
-                proposal_text += "## Hypotheses\n"
-                for h in proposal.get("hypotheses", []):
-                    proposal_text += f"- {h}\n"
-                proposal_text += "\n"
-
-                proposal_text += f"## Methodology\n{proposal.get('methodology', '')}\n\n"
-                proposal_text += f"## Expected Outcomes\n{proposal.get('expected_outcomes', '')}\n\n"
-                proposal_text += f"## Potential Challenges\n{proposal.get('potential_challenges', '')}\n\n"
-                proposal_text += f"## Ethical Considerations\n{proposal.get('ethical_considerations', '')}\n\n"
-                proposal_text += f"## Resource Requirements\n{proposal.get('resource_requirements', '')}\n\n"
-                proposal_text += f"## Timeline\n{proposal.get('timeline', '')}\n\n"
-
-                proposal_text += "## References\n"
-                for r in proposal.get("references", []):
-                    proposal_text += f"- {r}\n"
-
-                st.download_button(
-                    label=f"Download {title} (Text)",
-                    data=proposal_text,
-                    file_name=f"{filename}.txt",
-                    mime="text/plain",
-                )
+            # Download all proposals as text files in one archive
+            st.markdown("#### Download All Proposals (ZIP)")
+            st.download_button(
+                label="Download All Proposals (ZIP)",
+                data=proposals_zip(proposals),
+                file_name="research_proposals.zip",
+                mime="application/zip",
+            )
 
+            # Download a single proposal as text
+            st.markdown("#### Download Individual Proposal (Text)")
+            download_index = st.selectbox(
+                "Select a proposal to download",
+                range(len(proposals)),
+                format_func=lambda i: proposal_titles[i]
+            )
+            title = proposal_titles[download_index]
+            st.download_button(
+                label=f"Download {title} (Text)",
+                data=format_proposal_text(proposals[download_index], title),
+                file_name=f"{proposal_filename(title)}.txt",
+                mime="text/plain",
+            )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -27,23 +27,41 @@ LLM_TOP_P = 1.0
 LLM_TOP_K = 50
 
 # Agent Settings
-AGENT_VERBOSE = True
+AGENT_VERBOSE = os.getenv("CREWAI_VERBOSE", "False").lower() in ("true", "1", "t")
+AGENTS_CACHE = os.getenv("AGENTS_CACHE", "off").lower()  # "off" or "exact"
 
 # Task Settings
 TASK_ASYNC_EXECUTION = False
+IDEA_GENERATION_BRANCHES = int(os.getenv("IDEA_GENERATION_BRANCHES", "1"))  # Topic slices generated in parallel
+STAGE_MAX_PARALLEL = int(os.getenv("STAGE_MAX_PARALLEL", "3"))  # Concurrent kickoffs within a stage
+OPENAI_BATCH_TIMEOUT = int(os.getenv("OPENAI_BATCH_TIMEOUT", str(4 * 3600)))  # Seconds to wait for a --batch run before cancelling it
 
 # Search Settings
 SEARCH_MAX_RESULTS = 5
 SEARCH_MAX_PAGES = 3
+SEARCH_MAX_PARALLEL = 4  # Concurrent requests when several queries are searched at once
+TAVILY_USE_CACHE = os.getenv("TAVILY_USE_CACHE", "False").lower() in ("true", "1", "t")  # Ask Tavily to serve repeated queries from its cache
 
 # Web Scraping Settings
 SCRAPE_TIMEOUT = 30  # seconds
 SCRAPE_MAX_RETRIES = 3
+SCRAPE_MAX_RETRY_AFTER = 10  # seconds; longer Retry-After waits are cut short
 SCRAPE_USER_AGENT = "Research Proposal Generator Bot"
+SCRAPE_MAX_BYTES = 4 * 1024 * 1024  # Larger pages are truncated before parsing
+SCRAPE_MAX_PARALLEL = 8  # Concurrent fetches when several URLs are scraped at once
 
 # Output Settings
 JSON_OUTPUT_INDENT = 2
 
+# Result Cache Settings
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE", "True").lower() in ("true", "1", "t")
+RESULT_CACHE_DIR = BASE_DIR / ".cache" / "results"
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(7 * 86400)))  # seconds to reuse stage results; 0 disables
+RESULT_CACHE_SIMILARITY = float(os.getenv("RESULT_CACHE_SIMILARITY", "0"))  # e.g. 0.95; semantic matching of search queries, 0 disables
+RESULT_CACHE_EMBEDDING_MODEL = "text-embedding-3-small"
+TOOL_CACHE_TTL = int(os.getenv("TOOL_CACHE_TTL", "86400"))  # seconds to reuse search/scrape results; 0 disables
+TOOL_CACHE_TTL_RECENT = 6 * 3600  # shorter reuse window for searches naming the current or last year
+
 # Logging Configuration
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
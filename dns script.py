@@ -1,21 +1,49 @@
+import orjson
 import requests
 import os
+import json
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 
-def discover_correct_endpoint():
-    """Test various IBM Watson endpoints to find the correct one"""
-    print("Attempting to discover the correct IBM Watson ML endpoint...")
+# IAM tokens are valid for about an hour, so they are kept on disk between runs
+TOKEN_CACHE_PATH = Path.home() / ".cache" / "watson_iam_token.json"
 
-    # Get your IAM token first
-    iam_url = "https://iam.cloud.ibm.com/identity/token"
-    apikey = os.getenv("WATSONX_APIKEY")
+# Refresh a cached token this many seconds before it expires
+TOKEN_EXPIRY_MARGIN = 60
 
-    # Get IAM token
-    response = requests.post(
+
+def get_iam_token(session, iam_url, apikey):
+    """
+    Return an IAM access token, reusing the cached one while it is still valid.
+
+    Args:
+        session (requests.Session): Session used to request a new token
+        iam_url (str): IAM token endpoint
+        apikey (str): IBM Cloud API key
+
+    Returns:
+        str: The access token, or None if a new one could not be obtained
+    """
+    # Tokens are cached per API key, identified by a hash rather than the key itself
+    key_id = hashlib.sha256((apikey or "").encode("utf-8")).hexdigest()
+
+    try:
+        cached = json.loads(TOKEN_CACHE_PATH.read_text())
+        if cached["key_id"] == key_id and cached["expires_at"] > time.time() + TOKEN_EXPIRY_MARGIN:
+            return cached["token"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    response = session.post(
         iam_url,
         headers={"Content-Type": "application/x-www-form-urlencoded"},
         data={"grant_type": "urn:ibm:params:oauth:grant-type:apikey", "apikey": apikey},
@@ -24,9 +52,43 @@ def discover_correct_endpoint():
 
     if response.status_code != 200:
         print(f"❌ Failed to get IAM token: {response.status_code}")
-        return
+        return None
+
+    data = orjson.loads(response.content)
+    token = data.get("access_token")
+    if token and data.get("expiration"):
+        tmp_path = None
+        try:
+            TOKEN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            # mkstemp creates the file readable by the owner only, so the
+            # token is never exposed; it is then renamed into place
+            fd, tmp_path = tempfile.mkstemp(dir=TOKEN_CACHE_PATH.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"key_id": key_id, "token": token, "expires_at": data["expiration"]}, f)
+            os.replace(tmp_path, TOKEN_CACHE_PATH)
+        except OSError as e:
+            print(f"⚠️ Could not cache IAM token: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return token
 
-    token = response.json().get("access_token")
+
+def discover_correct_endpoint():
+    """Test various IBM Watson endpoints to find the correct one"""
+    print("Attempting to discover the correct IBM Watson ML endpoint...")
+
+    # Get your IAM token first
+    iam_url = "https://iam.cloud.ibm.com/identity/token"
+    apikey = os.getenv("WATSONX_APIKEY")
+
+    # One session for all requests, with a pool large enough for every probe
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+    # Get IAM token
+    token = get_iam_token(session, iam_url, apikey)
+    if token is None:
+        return
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json"
@@ -47,21 +109,32 @@ def discover_correct_endpoint():
         "https://ml.cloud.ibm.com",  # Root endpoint
     ]
 
-    # Test each endpoint
-    for endpoint in potential_endpoints:
-        try:
-            print(f"Testing endpoint: {endpoint}")
-            test_url = f"{endpoint}/ml/v1/models?version=2024-03-13"
-            response = requests.get(test_url, headers=headers, timeout=10)
+    # Probe all endpoints concurrently and take the first one that answers
+    print(f"Testing {len(potential_endpoints)} endpoints...")
+    executor = ThreadPoolExecutor(max_workers=len(potential_endpoints))
+    futures = {
+        executor.submit(session.get, f"{endpoint}/ml/v1/models?version=2024-03-13",
+                        headers=headers, timeout=10): endpoint
+        for endpoint in potential_endpoints
+    }
+    try:
+        for future in as_completed(futures):
+            endpoint = futures[future]
+            try:
+                response = future.result()
+            except requests.exceptions.RequestException as e:
+                print(f"❌ {endpoint} failed: {e}")
+                continue
 
             if response.status_code == 200:
                 print(f"✅ SUCCESS! Found working endpoint: {endpoint}")
                 print("Update your .env file with this endpoint.")
                 return endpoint
             else:
-                print(f"❌ Failed with status code: {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Failed: {e}")
+                print(f"❌ {endpoint} failed with status code: {response.status_code}")
+    finally:
+        # Don't wait for the slower probes once an answer is known
+        executor.shutdown(wait=False, cancel_futures=True)
 
     print("❌ Could not find a working endpoint.")
     return None
@@ -1,8 +1,11 @@
 from dotenv import load_dotenv
 from crewai import Crew, Process
-import json
+import asyncio
+import functools
 import logging
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Import tasks
@@ -14,6 +17,16 @@ from tasks.proposal_development_task import ProposalDevelopmentTask
 
 # Import utility functions
 from utils.helpers import validate_json_output, save_research_proposal
+from utils import llm_cache, openai_batch
+from config.settings import (
+    AGENT_VERBOSE,
+    IDEA_GENERATION_BRANCHES,
+    STAGE_MAX_PARALLEL,
+    RESULT_CACHE_TTL,
+    TOOL_CACHE_TTL,
+    OPENAI_BATCH_TIMEOUT
+)
+from models import LLM_TIERS
 
 # Load environment variables
 load_dotenv()
@@ -30,152 +43,414 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# CrewAI's verbose mode prints every agent step; off unless CREWAI_VERBOSE or --debug is set
+crew_verbose = AGENT_VERBOSE
+
+
+def _stage_crew(task):
+    """
+    Build a single-task sequential crew for a pipeline stage.
+
+    The agent factories are memoized, so every task of a stage shares one
+    agent. The crew is returned as a copy, which gives it its own agent
+    and task, so concurrent kickoffs (parallel branches, or several
+    Streamlit sessions) don't share the agent's executor state.
+    """
+    return Crew(
+        agents=[task.agent],
+        tasks=[task],
+        process=Process.sequential,
+        verbose=crew_verbose
+    ).copy()
+
+
+def _stage_cache_ttl(stage):
+    """
+    Return how long a stage's cached result may be reused, in seconds.
+
+    Paper finding searches the web for recent papers, so its result expires
+    along with the search and scrape results it was built from.
+    """
+    if stage == "paper_finding":
+        return min(RESULT_CACHE_TTL, TOOL_CACHE_TTL)
+    return RESULT_CACHE_TTL
+
+
+def _cache_lookup(stage, label, task, base_key, inputs=None):
+    """
+    Look up a cached result for a task, keyed on its rendered prompt.
+
+    Only exact matches are used: the rendered task is mostly fixed
+    instructions, so a semantic match would pair a different paper or idea
+    with an earlier run's result. Entries older than the stage's TTL are
+    ignored.
+
+    Returns:
+        tuple: (cache key, cached value or llm_cache.MISS)
+    """
+    cache_key = llm_cache.make_key(base_key, f"{task.description}\n{task.expected_output}", inputs)
+
+    cached = llm_cache.get(cache_key, max_age=_stage_cache_ttl(stage))
+    if cached is not llm_cache.MISS:
+        logger.info(f"Using cached {label} result")
+    return cache_key, cached
+
+
+def _validate_and_cache(label, result, cache_key):
+    """
+    Parse a stage result as JSON and cache it.
+
+    Only validated results are cached, so a malformed response is retried next run.
+
+    Returns:
+        The validated JSON result, or the raw crew output if it could not be parsed
+    """
+    try:
+        # Validate the text rather than the crew output object, which
+        # validate_json_output would hand back unchanged if it can't be parsed
+        data = validate_json_output(str(result))
+    except ValueError as e:
+        logger.error(f"Invalid {label} result: {str(e)}")
+        logger.warning(f"Proceeding with raw {label} result")
+        return result
+
+    if not isinstance(data, (dict, list)):
+        logger.warning(f"Proceeding with raw {label} result")
+        return result
+
+    logger.info(f"Completed {label} task")
+    llm_cache.put(cache_key, data)
+    return data
+
+
+def _run_stage(stage, make_task, base_key, inputs=None):
+    """
+    Run a single pipeline stage in its own crew, reusing a cached result if present.
+
+    Args:
+        stage (str): Stage identifier, e.g. "paper_finding"
+        make_task (callable): Zero-argument factory returning the stage's Task
+        base_key (str): Cache key material shared by every stage of the run
+        inputs (dict, optional): Inputs passed to crew.kickoff
+
+    Returns:
+        The validated JSON result, or the raw crew output if it could not be parsed
+    """
+    label = stage.replace("_", " ")
+
+    task = make_task()
+    cache_key, cached = _cache_lookup(stage, label, task, base_key, inputs)
+    if cached is not llm_cache.MISS:
+        return cached
+
+    crew = _stage_crew(task)
+
+    logger.info(f"Executing {label} task...")
+    result = crew.kickoff(inputs=inputs) if inputs else crew.kickoff()
+
+    return _validate_and_cache(label, result, cache_key)
+
 
-def main(input_paper, output_dir="output"):
+def _run_stage_fanout(stage, make_tasks, base_key, max_parallel=STAGE_MAX_PARALLEL, on_result=None):
+    """
+    Run independent tasks of one pipeline stage concurrently.
+
+    Each task runs in its own crew with at most `max_parallel` kickoffs in
+    flight, so the stage takes about as long as its slowest branch rather
+    than the sum of all branches. Every branch is cached separately.
+
+    Args:
+        stage (str): Stage identifier, e.g. "idea_generation"
+        make_tasks (list): Zero-argument factories, one per branch
+        base_key (str): Cache key material shared by every stage of the run
+        max_parallel (int, optional): Maximum number of concurrent kickoffs
+        on_result (callable, optional): Called with each branch result as soon as it is available
+
+    Returns:
+        list: The branch results, in the same order as `make_tasks`
+    """
+    label = stage.replace("_", " ")
+
+    async def run_branch(index, make_task, semaphore):
+        task = make_task()
+        cache_key, result = _cache_lookup(stage, f"{label} (branch {index})", task, base_key)
+        if result is llm_cache.MISS:
+            async with semaphore:
+                crew = _stage_crew(task)
+                logger.info(f"Executing {label} task, branch {index}/{len(make_tasks)}...")
+                result = await crew.kickoff_async()
+            result = _validate_and_cache(label, result, cache_key)
+
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(max_parallel)
+        return await asyncio.gather(*(
+            run_branch(i, make_task, semaphore) for i, make_task in enumerate(make_tasks, 1)
+        ))
+
+    return asyncio.run(run_all())
+
+
+def _task_messages(task):
+    """
+    Render a tool-free task as chat messages for a direct completion.
+
+    Mirrors the system and user prompts CrewAI builds for the agent, so the
+    request can be sent outside of a crew (e.g. through the Batch API).
+    """
+    agent = task.agent
+    system = getattr(agent, "system_prompt", None) or (
+        f"You are {agent.role}. {agent.backstory}\nYour personal goal is: {agent.goal}"
+    )
+    # Expected outputs escape braces for CrewAI's input interpolation
+    expected_output = task.expected_output.replace("{{", "{").replace("}}", "}")
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": f"{task.description}\n\nThis is the expected criteria for your final answer: "
+                                    f"{expected_output}"}
+    ]
+
+
+def _run_stage_batch(stage, make_tasks, base_key, on_result=None):
+    """
+    Run independent tasks of one pipeline stage through the OpenAI Batch API.
+
+    Batched requests cost less and bypass real-time rate limits but can take
+    up to the batch completion window, so this is meant for unattended runs.
+    Only tool-free tasks can be batched, since each task becomes a single
+    completion rather than an agent loop.
+
+    Args:
+        stage (str): Stage identifier, e.g. "proposal_development"
+        make_tasks (list): Zero-argument factories, one per request
+        base_key (str): Cache key material shared by every stage of the run
+        on_result (callable, optional): Called with each result as soon as it is available
+
+    Returns:
+        list: The parsed results, in the same order as `make_tasks`; failed requests are omitted
+    """
+    label = stage.replace("_", " ")
+
+    results = [None] * len(make_tasks)
+    pending = {}
+    for i, make_task in enumerate(make_tasks):
+        task = make_task()
+        cache_key, cached = _cache_lookup(stage, f"{label} (request {i + 1})", task, base_key)
+        if cached is not llm_cache.MISS:
+            results[i] = cached
+            if on_result is not None:
+                on_result(cached)
+        else:
+            pending[str(i)] = (task, cache_key)
+
+    if pending:
+        requests = [
+            openai_batch.build_request(custom_id, _task_messages(task),
+                                       getattr(task.agent.llm, "model", None),
+                                       getattr(task.agent.llm, "temperature", None))
+            for custom_id, (task, _) in pending.items()
+        ]
+        logger.info(f"Submitting {len(requests)} {label} requests to the batch API...")
+        completions = openai_batch.run_batch(requests, timeout=OPENAI_BATCH_TIMEOUT)
+
+        for custom_id, (task, cache_key) in pending.items():
+            completion = completions.get(custom_id)
+            if completion is None:
+                logger.error(f"No {label} result for batch request {custom_id}")
+                continue
+            results[int(custom_id)] = _validate_and_cache(label, completion, cache_key)
+            if on_result is not None:
+                on_result(results[int(custom_id)])
+
+    return [result for result in results if result is not None]
+
+
+def _split_analysis(analysis_data, branches):
+    """
+    Split a paper analysis into per-topic slices for parallel idea generation.
+
+    The key findings are dealt round-robin across the slices; methodologies,
+    limitations and trends are shared, since every branch should address them.
+
+    Args:
+        analysis_data: The output from the paper analysis stage
+        branches (int): Desired number of slices
+
+    Returns:
+        list: One analysis per branch; a single item if the analysis can't be split
+    """
+    if not isinstance(analysis_data, dict) or not isinstance(analysis_data.get("key_findings"), list):
+        return [analysis_data]
+
+    findings = analysis_data["key_findings"]
+    branches = min(branches, len(findings))
+    if branches <= 1:
+        return [analysis_data]
+
+    return [dict(analysis_data, key_findings=findings[i::branches]) for i in range(branches)]
+
+
+def _concat_results(results):
+    """
+    Concatenate the lists produced by the branches of a fanned-out stage.
+
+    Branch output that could not be parsed into JSON objects is dropped, so
+    callers only ever see a list of dicts.
+    """
+    merged = []
+    for result in results:
+        items = result if isinstance(result, list) else [result]
+        for item in items:
+            if isinstance(item, dict):
+                merged.append(item)
+            else:
+                logger.warning("Dropping a branch result that is not in the expected JSON format")
+    return merged
+
+
+def main(input_paper, output_dir="output", on_stage=None, batch=False):
     """
     Execute the research proposal generation workflow.
 
+    Stage results are cached on disk, keyed on the LLM settings, the prompt
+    templates and each task's rendered description (which embeds the input
+    paper or upstream stage output), so an unchanged run is served from the
+    cache without calling the LLM.
+
     Args:
-        input_paper (str): The title of the input paper to base the research on
+        input_paper (str or list): The title of the input paper to base the research on,
+            or several titles whose related papers are searched for concurrently
         output_dir (str): Directory to save the output proposals
+        on_stage (callable, optional): Called as on_stage(stage, result) after each
+            stage completes, so callers can show partial results while the run continues
+        batch (bool): Develop proposals through the OpenAI Batch API, at lower cost
+            but with results arriving within the batch window instead of right away
 
     Returns:
         dict: The generated research proposals
     """
+    if not isinstance(input_paper, str) and len(input_paper) == 1:
+        input_paper = input_paper[0]
+
     logger.info(f"Starting research proposal generation for: {input_paper}")
 
     try:
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
 
-        # Step 1: Create tasks with proper context passing
-        paper_finding_task = PaperFindingTask.create(input_paper)
-
-        # Step 2: Create crew with sequential process
-        crew = Crew(
-            agents=[
-                paper_finding_task.agent
-            ],
-            tasks=[
-                paper_finding_task
-            ],
-            process=Process.sequential,
-            verbose=True
+        # Everything that affects the LLM output besides the stage inputs themselves
+        base_key = llm_cache.make_key(
+            LLM_TIERS,
+            llm_cache.prompts_fingerprint()
         )
 
-        # Step 3: Execute the paper finding task
-        logger.info("Executing paper finding task...")
-        papers_result = crew.kickoff(inputs={"input_paper": input_paper})
-
-        # Validate the papers result
-        try:
-            # Handle different output types
-            papers_data = validate_json_output(papers_result)
-            logger.info(f"Found related papers")
-        except ValueError as e:
-            logger.error(f"Invalid papers result: {str(e)}")
-            logger.warning("Proceeding with raw paper finding result")
-            papers_data = papers_result
-
-        # Step 4: Paper analysis task
-        paper_analysis_task = PaperAnalysisTask.create(papers_data)
-        crew = Crew(
-            agents=[paper_analysis_task.agent],
-            tasks=[paper_analysis_task],
-            process=Process.sequential,
-            verbose=True
+        def run(stage, make_task, inputs=None):
+            data = _run_stage(stage, make_task, base_key, inputs)
+            if on_stage is not None:
+                on_stage(stage, data)
+            return data
+
+        # Step 1: Paper finding task, one concurrent search per input paper
+        if isinstance(input_paper, str):
+            papers_data = run(
+                "paper_finding",
+                lambda: PaperFindingTask.create(input_paper),
+                inputs={"input_paper": input_paper}
+            )
+        else:
+            papers_data = _concat_results(_run_stage_fanout(
+                "paper_finding",
+                [functools.partial(PaperFindingTask.create, paper) for paper in input_paper],
+                base_key
+            ))
+            if on_stage is not None:
+                on_stage("paper_finding", papers_data)
+
+        # Step 2: Paper analysis task
+        analysis_data = run(
+            "paper_analysis",
+            lambda: PaperAnalysisTask.create(papers_data)
         )
 
-        logger.info("Executing paper analysis task...")
-        analysis_result = crew.kickoff()
-
-        # Validate the analysis result
-        try:
-            analysis_data = validate_json_output(analysis_result)
-            logger.info("Successfully analyzed papers")
-        except ValueError as e:
-            logger.error(f"Invalid analysis result: {str(e)}")
-            logger.warning("Proceeding with raw analysis result")
-            analysis_data = analysis_result
-
-        # Step 5: Idea generation task
-        idea_generation_task = IdeaGenerationTask.create(analysis_data)
-        crew = Crew(
-            agents=[idea_generation_task.agent],
-            tasks=[idea_generation_task],
-            process=Process.sequential,
-            verbose=True
+        # Step 3: Idea generation task, fanned out across topic slices of the analysis
+        analysis_slices = _split_analysis(analysis_data, IDEA_GENERATION_BRANCHES)
+        if len(analysis_slices) == 1:
+            ideas_data = run(
+                "idea_generation",
+                lambda: IdeaGenerationTask.create(analysis_data)
+            )
+        else:
+            ideas_data = _concat_results(_run_stage_fanout(
+                "idea_generation",
+                [functools.partial(IdeaGenerationTask.create, part) for part in analysis_slices],
+                base_key
+            ))
+            if on_stage is not None:
+                on_stage("idea_generation", ideas_data)
+
+        # Step 4: Idea refinement task
+        refined_ideas_data = run(
+            "idea_refinement",
+            lambda: IdeaRefinementTask.create(ideas_data)
         )
 
-        logger.info("Executing idea generation task...")
-        ideas_result = crew.kickoff()
-
-        # Validate the ideas result
-        try:
-            ideas_data = validate_json_output(ideas_result)
-            logger.info("Generated research ideas")
-        except ValueError as e:
-            logger.error(f"Invalid ideas result: {str(e)}")
-            logger.warning("Proceeding with raw ideas result")
-            ideas_data = ideas_result
-
-        # Step 6: Idea refinement task
-        idea_refinement_task = IdeaRefinementTask.create(ideas_data)
-        crew = Crew(
-            agents=[idea_refinement_task.agent],
-            tasks=[idea_refinement_task],
-            process=Process.sequential,
-            verbose=True
-        )
-
-        logger.info("Executing idea refinement task...")
-        refined_ideas_result = crew.kickoff()
-
-        # Validate the refined ideas result
-        try:
-            refined_ideas_data = validate_json_output(refined_ideas_result)
-            logger.info("Refined research ideas")
-        except ValueError as e:
-            logger.error(f"Invalid refined ideas result: {str(e)}")
-            logger.warning("Proceeding with raw refined ideas result")
-            refined_ideas_data = refined_ideas_result
-
-        # Step 7: Proposal development task
-        proposal_development_task = ProposalDevelopmentTask.create(refined_ideas_data)
-        crew = Crew(
-            agents=[proposal_development_task.agent],
-            tasks=[proposal_development_task],
-            process=Process.sequential,
-            verbose=True
-        )
-
-        logger.info("Executing proposal development task...")
-        proposals_result = crew.kickoff()
-
-        # Step 8: Process and validate the final result
-        try:
-            proposals = validate_json_output(proposals_result)
-            logger.info(f"Generated research proposals")
-
-            # Save the proposals to disk
-            if isinstance(proposals, list):
-                for i, proposal in enumerate(proposals, 1):
-                    filepath = save_research_proposal(proposal, output_dir)
-                    logger.info(f"Saved proposal {i} to {filepath}")
+        # Proposals are written to disk as soon as each one is ready, so the
+        # writes overlap with the proposals that are still being developed
+        with ThreadPoolExecutor(max_workers=8) as save_pool:
+            saves = []
+
+            def save_proposals(result):
+                # A single-idea task may return its proposal as one object
+                # rather than a list of one, as _concat_results also allows
+                if isinstance(result, dict):
+                    result = [result]
+                if not isinstance(result, list):
+                    return
+                for proposal in result:
+                    # A branch whose output could not be parsed contributes its raw text
+                    if isinstance(proposal, dict):
+                        saves.append(save_pool.submit(save_research_proposal, proposal, output_dir))
+                    else:
+                        logger.warning("A proposal is not in the expected JSON format, not saving it")
+
+            # Step 5: Proposal development task, one concurrent (or batched) task per refined idea
+            if isinstance(refined_ideas_data, list) and (batch or len(refined_ideas_data) > 1):
+                run_ideas = _run_stage_batch if batch else _run_stage_fanout
+                proposals = _concat_results(run_ideas(
+                    "proposal_development",
+                    [functools.partial(ProposalDevelopmentTask.create, [idea]) for idea in refined_ideas_data],
+                    base_key,
+                    on_result=save_proposals
+                ))
+                if on_stage is not None:
+                    on_stage("proposal_development", proposals)
             else:
+                proposals = run(
+                    "proposal_development",
+                    lambda: ProposalDevelopmentTask.create(refined_ideas_data)
+                )
+                save_proposals(proposals)
+
+            # Step 6: Process the final result
+            if not isinstance(proposals, (list, dict)):
+                logger.warning("Returning raw result")
+                print("Result was not in expected JSON format:")
+                print(proposals)
+                return proposals
+
+            if not isinstance(proposals, list):
                 logger.warning("Proposals is not a list, unable to save individual proposals")
 
-            # Display summary information
-            display_proposals_summary(proposals)
+            for i, save in enumerate(saves, 1):
+                logger.info(f"Saved proposal {i} to {save.result()}")
 
-            return proposals
+        # Display summary information
+        display_proposals_summary(proposals)
 
-        except ValueError as e:
-            logger.error(f"Error processing final result: {str(e)}")
-            logger.warning("Returning raw result")
-            print("Result was not in expected JSON format:")
-            print(proposals_result)
-            return proposals_result
+        return proposals
 
     except Exception as e:
         logger.error(f"Error in research proposal generation: {str(e)}", exc_info=True)
@@ -197,15 +472,16 @@ def display_proposals_summary(proposals):
         print(f"\nProposals is not a list, but a {type(proposals)}.")
         return
 
-    print(f"\nGenerated {len(proposals)} research proposals:")
+    # Build the whole summary and write it in one go rather than line by line
+    lines = [f"\nGenerated {len(proposals)} research proposals:"]
 
     for i, proposal in enumerate(proposals, 1):
         if not isinstance(proposal, dict):
-            print(f"\nProposal {i}: Not a dictionary, skipping display")
+            lines.append(f"\nProposal {i}: Not a dictionary, skipping display")
             continue
 
-        print(f"\nProposal {i}:")
-        print(f"Title: {proposal.get('proposal_title', 'N/A')}")
+        lines.append(f"\nProposal {i}:")
+        lines.append(f"Title: {proposal.get('proposal_title', 'N/A')}")
 
         # Safely get text properties with fallbacks
         methodology = proposal.get('methodology', 'N/A')
@@ -215,21 +491,31 @@ def display_proposals_summary(proposals):
         methodology_preview = methodology[:200] + "..." if len(methodology) > 200 else methodology
         outcomes_preview = outcomes[:200] + "..." if len(outcomes) > 200 else outcomes
 
-        print(f"Methodology: {methodology_preview}")
-        print(f"Expected Outcomes: {outcomes_preview}")
-        print("-" * 80)
+        lines.append(f"Methodology: {methodology_preview}")
+        lines.append(f"Expected Outcomes: {outcomes_preview}")
+        lines.append("-" * 80)
 
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Generate research proposals based on an input paper")
-    parser.add_argument("paper_title", type=str, nargs="?",
-                        default="Advanced Machine Learning Techniques for Scientific Discovery",
-                        help="Title of the input paper to base research on")
+    parser.add_argument("paper_title", type=str, nargs="*",
+                        default=["Advanced Machine Learning Techniques for Scientific Discovery"],
+                        help="Title of the input paper to base research on; "
+                             "pass several titles to search for related papers concurrently")
     parser.add_argument("--output", "-o", type=str, default="output",
                         help="Directory to save output proposals")
 
+    parser.add_argument("--batch", action="store_true",
+                        help="Develop proposals through the OpenAI Batch API (cheaper, completes within 24h)")
+
+    parser.add_argument("--debug", action="store_true",
+                        help="Print every agent step (CrewAI verbose mode)")
+
     args = parser.parse_args()
+    if args.debug:
+        crew_verbose = True
 
-    main(args.paper_title, args.output)
\ No newline at end of file
+    main(args.paper_title, args.output, batch=args.batch)
\ No newline at end of file
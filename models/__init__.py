@@ -1,4 +1,4 @@
 # models/__init__.py
-from models.openai_llm import llm
+from models.openai_llm import get_llm, LLM_TIERS
 
-__all__ = ['llm']
\ No newline at end of file
+__all__ = ['get_llm', 'LLM_TIERS']
\ No newline at end of file
@@ -1,32 +1,79 @@
 # models/openai_llm.py
 import os
+import atexit
 import logging
-from crewai import LLM
+import threading
 
 logger = logging.getLogger(__name__)
 
-# Check for API key
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    logger.warning("OpenAI API key not found in environment variables. Make sure to set OPENAI_API_KEY.")
+# Model and temperature per capability tier. Search and analysis don't need
+# frontier reasoning; idea generation samples more freely than the rest.
+LLM_TIERS = {
+    "cheap": ("gpt-4o-mini", 0),
+    "smart": ("gpt-4o", 0),
+    "creative": ("gpt-4o", 0.4),
+}
 
-try:
-    # Initialize the OpenAI LLM - IMPORTANT: Do NOT use the 'provider' parameter
-    llm = LLM(
-        model="gpt-4o",  # You can also use "gpt-3.5-turbo" for a more cost-effective option
-        api_key=api_key,
-        temperature=0
-    )
-    logger.info(f"Successfully initialized OpenAI LLM")
+# LLMs are created on first use, so importing this module (e.g. during test
+# collection) neither imports crewai nor requires an API key.
+_tier_llms = {}
+_tier_lock = threading.Lock()
 
-except Exception as e:
-    logger.error(f"Error initializing OpenAI LLM: {str(e)}")
+# Connection pool limits for the shared HTTP client used by all LLM calls
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_TIMEOUT = 60.0
 
 
-    # Define a fallback that will raise a clear error if used
-    class FallbackLLM:
-        def __call__(self, *args, **kwargs):
-            raise RuntimeError("OpenAI LLM initialization failed. Please check your API key.")
+def _configure_http_pool():
+    """
+    Route LLM requests through one long-lived, pooled HTTP client.
 
+    CrewAI sends completions through litellm, which uses
+    litellm.client_session for its OpenAI client when it is set. Sharing a
+    single client lets concurrent kickoffs reuse warm keep-alive
+    connections instead of each paying a fresh TCP and TLS handshake.
+    """
+    import httpx
+    import litellm
 
-    llm = FallbackLLM()
\ No newline at end of file
+    if litellm.client_session is None:
+        client = httpx.Client(
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS),
+            timeout=httpx.Timeout(HTTP_TIMEOUT)
+        )
+        litellm.client_session = client
+        atexit.register(client.close)
+
+
+def get_llm(tier="smart"):
+    """
+    Return the shared LLM instance for a capability tier.
+
+    Args:
+        tier (str): One of the LLM_TIERS keys
+
+    Returns:
+        LLM: The LLM configured for the tier, created on first use
+
+    Raises:
+        RuntimeError: If OPENAI_API_KEY is not set
+    """
+    with _tier_lock:
+        if tier not in _tier_llms:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise RuntimeError("OpenAI API key not found in environment variables. "
+                                   "Make sure to set OPENAI_API_KEY.")
+
+            from crewai import LLM
+
+            if not _tier_llms:
+                _configure_http_pool()
+
+            # IMPORTANT: Do NOT use the 'provider' parameter
+            model, temperature = LLM_TIERS[tier]
+            _tier_llms[tier] = LLM(model=model, api_key=api_key, temperature=temperature)
+            logger.info(f"Initialized {tier} LLM tier: {model}")
+        return _tier_llms[tier]
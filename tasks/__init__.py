@@ -1,3 +1,11 @@
+"""
+CrewAI tasks for each stage of the research proposal pipeline.
+
+Task descriptions start with the stage's fixed instructions and end with the
+dynamic payload (the input paper or upstream stage output), so the prompt
+prefix is identical across runs and can be served from the provider's
+prompt cache.
+"""
 from tasks.paper_finding_task import PaperFindingTask
 from tasks.paper_analysis_task import PaperAnalysisTask
 from tasks.idea_generation_task import IdeaGenerationTask
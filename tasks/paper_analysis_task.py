@@ -1,51 +1,23 @@
 from crewai import Task
 from agents.research_paper_analyst import ResearchPaperAnalyst
+from utils.prompt_compress import compact_context_block
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
+# Static task instructions; the serialized stage output is appended after them
+_INSTRUCTIONS = (
+    "Analyze the related papers to identify key knowledge, methodologies, and limitations. "
+    "For each paper, extract the main contributions, methodological approaches, and technological innovations. "
+    "Identify any limitations, gaps, or unanswered questions mentioned in the papers. "
+    "Synthesize information across the papers to identify emerging trends, patterns, and contradictions. "
+    "Be critical but fair in your assessment of the research. "
+    "Focus on substantive insights rather than superficial details.\n\n"
+    "Here are the papers to analyze:\n"
+)
 
-class PaperAnalysisTask:
-    """Task for analyzing the related papers to identify key knowledge and limitations."""
-
-    @staticmethod
-    def create(research_papers=None):
-        """
-        Create a task for analyzing research papers.
-
-        Args:
-            research_papers: The output from the paper finding task
-
-        Returns:
-            Task: A configured CrewAI task
-        """
-        logger.info("Creating paper analysis task")
-
-        # Create the agent for this task
-        agent = ResearchPaperAnalyst.create()
-
-        # Convert research_papers to a string for the task description
-        papers_str = ""
-        if research_papers is not None:
-            if isinstance(research_papers, (list, dict)):
-                papers_str = json.dumps(research_papers, indent=2)
-            else:
-                papers_str = str(research_papers)
-
-        # Create task description with specific instructions
-        task_description = (
-            "Analyze the related papers to identify key knowledge, methodologies, and limitations. "
-            "For each paper, extract the main contributions, methodological approaches, and technological innovations. "
-            "Identify any limitations, gaps, or unanswered questions mentioned in the papers. "
-            "Synthesize information across the papers to identify emerging trends, patterns, and contradictions. "
-            "Be critical but fair in your assessment of the research. "
-            "Focus on substantive insights rather than superficial details.\n\n"
-            f"Here are the papers to analyze:\n{papers_str}"
-        )
-
-        # Define expected output format with schema example - USE TRIPLE QUOTES AND ESCAPE BRACES
-        expected_output = """A JSON object summarizing key knowledge and limitations with this structure:
+# Expected output format with schema example - USE TRIPLE QUOTES AND ESCAPE BRACES
+_EXPECTED_OUTPUT = """A JSON object summarizing key knowledge and limitations with this structure:
 {{
   "key_findings": [
     {{
@@ -78,9 +50,56 @@ class PaperAnalysisTask:
 }}
 """
 
+# Paper fields the analysis draws on; anything else the finder returns
+# (URLs, extra metadata) is left out of the prompt
+_PAPER_FIELDS = ("title", "authors", "year", "venue", "summary")
+
+
+def _project_papers(papers):
+    """Keep only the fields used for analysis from each paper in a paper list."""
+    if not isinstance(papers, list):
+        return papers
+    return [
+        {key: paper[key] for key in _PAPER_FIELDS if key in paper} if isinstance(paper, dict) else paper
+        for paper in papers
+    ]
+
+
+class PaperAnalysisTask:
+    """Task for analyzing the related papers to identify key knowledge and limitations."""
+
+    @staticmethod
+    def create(research_papers=None):
+        """
+        Create a task for analyzing research papers.
+
+        Args:
+            research_papers: The output from the paper finding task
+
+        Returns:
+            Task: A configured CrewAI task
+        """
+        logger.info("Creating paper analysis task")
+
+        # Create the agent for this task
+        agent = ResearchPaperAnalyst.create()
+
+        # Convert research_papers to a string for the task description
+        papers_str = ""
+        if research_papers is not None:
+            if isinstance(research_papers, str):
+                # Already serialized upstream; pass through without a parse/dump roundtrip
+                papers_str = research_papers
+            elif isinstance(research_papers, (list, dict)):
+                papers_str = compact_context_block(_project_papers(research_papers))
+            else:
+                papers_str = str(research_papers)
+
+        task_description = _INSTRUCTIONS + papers_str
+
         return Task(
             description=task_description,
-            expected_output=expected_output,
+            expected_output=_EXPECTED_OUTPUT,
             agent=agent,
             context=[],  # Use empty list like paper_finding_task
             async_execution=False
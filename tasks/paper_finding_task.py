@@ -5,6 +5,21 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Expected output format with schema example - ESCAPE CURLY BRACES
+_EXPECTED_OUTPUT = """A JSON list of papers with this structure:
+[
+  {{
+    "title": "Paper Title",
+    "authors": "Author1, Author2, ...",
+    "year": 2023,
+    "venue": "Journal/Conference Name",
+    "url": "https://paper-url.com",
+    "summary": "Brief summary of the paper's key contributions"
+  }},
+  ...
+]
+"""
+
 
 class PaperFindingTask:
     """Task for finding relevant scientific papers."""
@@ -34,24 +49,9 @@ class PaperFindingTask:
             f"Return your findings as a well-structured JSON list of papers."
         )
 
-        # Define expected output format with schema example - ESCAPE CURLY BRACES
-        expected_output = """A JSON list of papers with this structure:
-[
-  {{
-    "title": "Paper Title",
-    "authors": "Author1, Author2, ...",
-    "year": 2023,
-    "venue": "Journal/Conference Name",
-    "url": "https://paper-url.com",
-    "summary": "Brief summary of the paper's key contributions"
-  }},
-  ...
-]
-"""
-
         return Task(
             description=task_description,
-            expected_output=expected_output,
+            expected_output=_EXPECTED_OUTPUT,
             agent=agent,
             context=[],
             async_execution=False
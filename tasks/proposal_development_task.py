@@ -1,10 +1,44 @@
 from crewai import Task
 from agents.research_proposal_developer import ResearchProposalDeveloper
+from utils.prompt_compress import compact_context_block
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
+# Static task instructions; the serialized stage output is appended after them
+_INSTRUCTIONS = (
+    "Transform the refined research ideas into complete, well-structured research proposals. "
+    "For each idea, develop a formal research proposal with clear objectives, hypotheses, and significance. "
+    "Include detailed methodology sections that outline specific approaches, techniques, and experimental designs. "
+    "Define expected outcomes and their significance to the field. "
+    "Address potential challenges and provide mitigation strategies. "
+    "Consider ethical implications and necessary approvals where relevant. "
+    "Outline resource requirements and approximate timelines for different phases. "
+    "Write in a formal, academic style appropriate for research proposals.\n\n"
+    "Here are the refined ideas to develop into proposals:\n"
+)
+
+# Expected output format with schema example - USE TRIPLE QUOTES AND ESCAPE BRACES
+_EXPECTED_OUTPUT = """A JSON list of research proposals with this structure:
+[
+  {{
+    "proposal_title": "Final Research Proposal Title",
+    "refined_idea_title": "Title from Refined Idea",
+    "introduction": "Introduction and background of the research problem",
+    "research_questions": ["Question 1", "Question 2"],
+    "hypotheses": ["Hypothesis 1", "Hypothesis 2"],
+    "methodology": "Detailed description of methodology and approaches",
+    "expected_outcomes": "Description of expected outcomes and significance",
+    "potential_challenges": "Challenges and mitigation strategies",
+    "ethical_considerations": "Relevant ethical considerations",
+    "resource_requirements": "Required resources and budget considerations",
+    "timeline": "Projected timeline for research phases",
+    "references": ["Reference 1", "Reference 2"]
+  }},
+  ...
+]
+"""
+
 
 class ProposalDevelopmentTask:
     """Task for developing complete research proposals from refined ideas."""
@@ -28,48 +62,19 @@ class ProposalDevelopmentTask:
         # Convert refined_ideas to a string for the task description
         ideas_str = ""
         if refined_ideas is not None:
-            if isinstance(refined_ideas, (list, dict)):
-                ideas_str = json.dumps(refined_ideas, indent=2)
+            if isinstance(refined_ideas, str):
+                # Already serialized upstream; pass through without a parse/dump roundtrip
+                ideas_str = refined_ideas
+            elif isinstance(refined_ideas, (list, dict)):
+                ideas_str = compact_context_block(refined_ideas)
             else:
                 ideas_str = str(refined_ideas)
 
-        # Create task description with specific instructions
-        task_description = (
-            "Transform the refined research ideas into complete, well-structured research proposals. "
-            "For each idea, develop a formal research proposal with clear objectives, hypotheses, and significance. "
-            "Include detailed methodology sections that outline specific approaches, techniques, and experimental designs. "
-            "Define expected outcomes and their significance to the field. "
-            "Address potential challenges and provide mitigation strategies. "
-            "Consider ethical implications and necessary approvals where relevant. "
-            "Outline resource requirements and approximate timelines for different phases. "
-            "Write in a formal, academic style appropriate for research proposals.\n\n"
-            f"Here are the refined ideas to develop into proposals:\n{ideas_str}"
-        )
-
-        # Define expected output format with schema example - USE TRIPLE QUOTES AND ESCAPE BRACES
-        expected_output = """A JSON list of research proposals with this structure:
-[
-  {{
-    "proposal_title": "Final Research Proposal Title",
-    "refined_idea_title": "Title from Refined Idea",
-    "introduction": "Introduction and background of the research problem",
-    "research_questions": ["Question 1", "Question 2"],
-    "hypotheses": ["Hypothesis 1", "Hypothesis 2"],
-    "methodology": "Detailed description of methodology and approaches",
-    "expected_outcomes": "Description of expected outcomes and significance",
-    "potential_challenges": "Challenges and mitigation strategies",
-    "ethical_considerations": "Relevant ethical considerations",
-    "resource_requirements": "Required resources and budget considerations",
-    "timeline": "Projected timeline for research phases",
-    "references": ["Reference 1", "Reference 2"]
-  }},
-  ...
-]
-"""
+        task_description = _INSTRUCTIONS + ideas_str
 
         return Task(
             description=task_description,
-            expected_output=expected_output,
+            expected_output=_EXPECTED_OUTPUT,
             agent=agent,
             context=[],  # Use empty list like paper_finding_task
             async_execution=False
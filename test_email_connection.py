@@ -6,12 +6,14 @@ Run this script to test if your email configuration is working correctly.
 
 import os
 import sys
-import smtplib
 import logging
+import string
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from dotenv import load_dotenv
 
+from utils.email_utils import SMTPConnection
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,6 +21,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Load environment variables
+load_dotenv()
+
+# Test email body, compiled once at import
+_BODY_TEMPLATE = string.Template("""
+        <html>
+        <body>
+            <h2>Gmail Connection Test</h2>
+            <p>This is a test email to verify that your Gmail SMTP settings are working correctly.</p>
+            <p>If you're seeing this message, your configuration is working!</p>
+            <hr>
+            <p>Configuration details:</p>
+            <ul>
+                <li>SMTP Server: $server</li>
+                <li>SMTP Port: $port</li>
+                <li>Sender: $sender</li>
+            </ul>
+        </body>
+        </html>
+        """)
+
 
 def test_email_connection(recipient_email=None):
     """
@@ -31,9 +54,6 @@ def test_email_connection(recipient_email=None):
     Returns:
         bool: True if successful, False otherwise
     """
-    # Load environment variables
-    load_dotenv()
-
     # Get email configuration
     email_sender = os.getenv("EMAIL_SENDER")
     email_password = os.getenv("EMAIL_PASSWORD")
@@ -64,39 +84,18 @@ def test_email_connection(recipient_email=None):
         msg['Subject'] = "Test Email - Gmail Connection"
 
         # Email body
-        body = """
-        <html>
-        <body>
-            <h2>Gmail Connection Test</h2>
-            <p>This is a test email to verify that your Gmail SMTP settings are working correctly.</p>
-            <p>If you're seeing this message, your configuration is working!</p>
-            <hr>
-            <p>Configuration details:</p>
-            <ul>
-                <li>SMTP Server: {}</li>
-                <li>SMTP Port: {}</li>
-                <li>Sender: {}</li>
-            </ul>
-        </body>
-        </html>
-        """.format(smtp_server, smtp_port, email_sender)
+        body = _BODY_TEMPLATE.substitute(server=smtp_server, port=smtp_port, sender=email_sender)
 
         msg.attach(MIMEText(body, 'html'))
 
-        # Connect to SMTP server
+        # Connect to SMTP server and send email, through the same connection class the app uses
         logger.info("Connecting to SMTP server...")
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            # Start TLS encryption
-            logger.info("Starting TLS encryption...")
-            server.starttls()
-
-            # Login
-            logger.info("Logging in...")
-            server.login(email_sender, email_password)
-
-            # Send email
-            logger.info(f"Sending test email to {recipient_email}...")
-            server.send_message(msg)
+        connection = SMTPConnection(smtp_server, smtp_port, email_sender, email_password)
+        try:
+            logger.info(f"Sending email to {msg['To']}...")
+            connection.send_message(msg)
+        finally:
+            connection.close()
 
         logger.info("Email sent successfully!")
         logger.info(f"Check {recipient_email} for the test message")
@@ -1,6 +1,6 @@
 # test_openai.py
 from dotenv import load_dotenv
-from models.openai_llm import llm
+from models.openai_llm import get_llm
 
 # Load environment variables
 load_dotenv()
@@ -9,7 +9,7 @@ def test_openai_connection():
     """Test if the OpenAI LLM is working properly."""
     try:
         # A simple test message
-        response = llm("Hello, can you hear me?")
+        response = get_llm()("Hello, can you hear me?")
         print("Connection successful!")
         print(f"Response: {response}")
         return True
@@ -2,7 +2,20 @@
 Base tool implementation compatible with CrewAI 0.75.0
 """
 from typing import Any, Dict, Callable, Optional, List, Type
-import json
+import orjson
+
+# Parameter names tried, in order, when a tool receives a dict of arguments
+_INPUT_KEYS = ('query', 'expression', 'tool_input')
+
+
+def _select_input(data: Dict[str, Any]) -> Any:
+    """Pick the tool's input out of a dict of arguments."""
+    for key in _INPUT_KEYS:
+        if key in data:
+            return data[key]
+    # If no recognized parameter, use the first value
+    return next(iter(data.values()))
+
 
 class BaseTool:
     """Base class for tools compatible with CrewAI 0.75.0"""
@@ -45,37 +58,20 @@ class BaseTool:
                 return "Error: No input provided to tool"
 
             # Handle input data
-            if isinstance(input_data, dict):
-                # If input is already a dict, extract the right parameter
-                if 'query' in input_data:
-                    return self._func(input_data['query'])
-                elif 'expression' in input_data:
-                    return self._func(input_data['expression'])
-                elif 'tool_input' in input_data:
-                    return self._func(input_data['tool_input'])
-                else:
-                    # Just use the first value in the dict
-                    return self._func(next(iter(input_data.values())))
-            elif isinstance(input_data, str):
-                # Try to parse as JSON if it's a string
-                if input_data.startswith('{'):
+            if isinstance(input_data, str):
+                # Only strings that look like a JSON object are parsed; agents
+                # often add surrounding whitespace such as a trailing newline
+                stripped = input_data.strip()
+                if stripped.startswith('{') and stripped.endswith('}'):
                     try:
-                        parsed_input = json.loads(input_data)
-                        if 'query' in parsed_input:
-                            return self._func(parsed_input['query'])
-                        elif 'expression' in parsed_input:
-                            return self._func(parsed_input['expression'])
-                        elif 'tool_input' in parsed_input:
-                            return self._func(parsed_input['tool_input'])
-                        else:
-                            # If no recognized parameter, use the first value
-                            return self._func(next(iter(parsed_input.values())))
-                    except json.JSONDecodeError:
+                        return self._func(_select_input(orjson.loads(input_data)))
+                    except orjson.JSONDecodeError:
                         # If not valid JSON, just use the string directly
-                        return self._func(input_data)
-                else:
-                    # If not JSON, pass the input directly
-                    return self._func(input_data)
+                        pass
+                return self._func(input_data)
+            elif isinstance(input_data, dict):
+                # If input is already a dict, extract the right parameter
+                return self._func(_select_input(input_data))
             else:
                 # For any other type, convert to string
                 return self._func(str(input_data))
@@ -2,23 +2,113 @@
 Tool for scraping website content.
 """
 import logging
+import re
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 
 # Import from the base_tool module directly to avoid circular imports
 from tools.base_tool import create_tool
+from utils import llm_cache
 
 # Import configuration
 from config.settings import (
     SCRAPE_TIMEOUT,
     SCRAPE_MAX_RETRIES,
-    SCRAPE_USER_AGENT
+    SCRAPE_MAX_RETRY_AFTER,
+    SCRAPE_USER_AGENT,
+    SCRAPE_MAX_BYTES,
+    SCRAPE_MAX_PARALLEL,
+    TOOL_CACHE_TTL
 )
 
 logger = logging.getLogger(__name__)
 
+
+class _CappedRetry(Retry):
+    """Retry policy that honours Retry-After only up to SCRAPE_MAX_RETRY_AFTER seconds."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, SCRAPE_MAX_RETRY_AFTER)
+
+
+# One session for all scrapes, so connections to a site are kept alive and
+# reused. Rate-limited and server-error responses are retried with backoff,
+# waiting as long as the server's Retry-After header asks, up to a cap so a
+# tool call is never blocked for long.
+_SESSION = requests.Session()
+_SESSION.headers['User-Agent'] = SCRAPE_USER_AGENT
+_SESSION.headers['Accept'] = 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8'
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=_CappedRetry(
+        total=SCRAPE_MAX_RETRIES,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET', 'HEAD'),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+)
+_SESSION.mount('http://', _adapter)
+_SESSION.mount('https://', _adapter)
+
+# Tags the content-container and metadata extraction look at. Parsing only
+# these (with everything nested inside them) skips scripts, styles and other
+# page furniture; the section fallbacks, which depend on sibling order, use
+# the full tree instead.
+_PARSE_ONLY = SoupStrainer([
+    'article', 'main', 'div', 'a', 'span', 'meta', 'time', 'title'
+])
+
+# Containers whose class or id mentions one of these are content candidates
+_CONTENT_SELECTOR = ', '.join(
+    f'{tag}[{attr}*="{keyword}"]'
+    for tag in ('article', 'main', 'div')
+    for attr in ('class', 'id')
+    for keyword in ('article', 'content', 'paper', 'research', 'abstract', 'body', 'text', 'main')
+)
+
+_DATE_META_NAMES = ('date', 'pubdate', 'publication_date')
+_AUTHOR_META_NAMES = ('author', 'citation_author')
+
+# Every element metadata is read from, so it is collected in one tree walk:
+# the title, date meta tags and <time> elements, author meta tags, and links
+# or spans whose class marks them as an author
+_METADATA_SELECTOR = ', '.join(
+    ['title', 'time[datetime]'] +
+    [f'meta[name="{name}"]' for name in _DATE_META_NAMES + _AUTHOR_META_NAMES] + [
+        f'{tag}[class*="{keyword}"]'
+        for tag in ('a', 'span', 'div')
+        for keyword in ('author', 'creator', 'contributor')
+    ]
+)
+
+# Common section headers in papers, matched against lowercased text
+_SECTION_HEADER_RE = re.compile(
+    'abstract|introduction|method|result|discussion|conclusion|reference'
+)
+
+def _read_capped(response) -> bytes:
+    """Read a streamed response body, stopping after SCRAPE_MAX_BYTES."""
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= SCRAPE_MAX_BYTES:
+            logger.info(f"Truncating {response.url} at {SCRAPE_MAX_BYTES} bytes")
+            break
+    return b"".join(chunks)[:SCRAPE_MAX_BYTES]
+
 def scrape_website_func(url: str) -> str:
     """
     Extract text content from a website URL.
@@ -30,49 +120,43 @@ def scrape_website_func(url: str) -> str:
     Returns:
         str: Extracted content or error message
     """
-    logger.info(f"Scraping website: {url}")
+    # Pages fetched recently are served from the disk cache
+    cache_key = llm_cache.make_key("scrape_website", url)
+    if TOOL_CACHE_TTL > 0:
+        cached = llm_cache.get(cache_key, max_age=TOOL_CACHE_TTL)
+        if cached is not llm_cache.MISS:
+            logger.info(f"Using cached scrape of: {url}")
+            return cached
 
-    # Define headers
-    headers = {
-        'User-Agent': SCRAPE_USER_AGENT
-    }
+    logger.info(f"Scraping website: {url}")
 
-    def extract_main_content(soup):
+    def extract_main_content(soup, html):
         """Extract the main content from a webpage"""
         # Try to find common content containers in academic sites
-        content_candidates = []
-
-        # Look for article or main content tags
-        article_tags = soup.find_all(['article', 'main', 'div'])
-
-        for tag in article_tags:
-            # Check for common article class/id names
-            if tag.get('class') and any(c in str(tag.get('class')) for c in [
-                'article', 'content', 'paper', 'research', 'abstract', 'body', 'text', 'main'
-            ]):
-                content_candidates.append(tag)
-
-            # Check for common article IDs
-            if tag.get('id') and any(c in str(tag.get('id')) for c in [
-                'article', 'content', 'paper', 'research', 'abstract', 'body', 'text', 'main'
-            ]):
-                content_candidates.append(tag)
+        content_candidates = soup.select(_CONTENT_SELECTOR)
 
         # If we found potential content containers, use the longest one
         if content_candidates:
             content_candidates.sort(key=lambda x: len(str(x)), reverse=True)
             return content_candidates[0].get_text(separator=' ', strip=True)
 
+        # The fallbacks need every element, so that a section heading's next
+        # sibling is really the element that follows it in the page
+        full_soup = BeautifulSoup(html, 'lxml')
+        try:
+            return extract_sections(full_soup)
+        finally:
+            full_soup.decompose()
+
+    def extract_sections(soup):
+        """Extract content from section headings, paragraphs or the whole page"""
         # Fallback to common academic paper sections
         sections = []
 
         # Try to extract paper sections
         for section_tag in soup.find_all(['section', 'div', 'h1', 'h2', 'h3']):
             # Check for common section headers in papers
-            if any(header in section_tag.get_text().lower() for header in [
-                'abstract', 'introduction', 'method', 'methodology', 'result',
-                'discussion', 'conclusion', 'reference'
-            ]):
+            if _SECTION_HEADER_RE.search(section_tag.get_text().lower()):
                 # Get the section and its content
                 sections.append(f"\n\n{section_tag.get_text(strip=True)}")
 
@@ -95,59 +179,54 @@ def scrape_website_func(url: str) -> str:
     def extract_metadata(soup):
         """Extract metadata from an academic paper or website"""
         metadata = {}
-
-        # Try to extract title
-        title_tag = soup.find('title')
-        if title_tag:
-            metadata['title'] = title_tag.get_text(strip=True)
-
-        # Try to extract publication date
-        date_tags = soup.find_all(['time', 'meta'])
-        for tag in date_tags:
-            if tag.name == 'meta' and tag.get('name') in ['date', 'pubdate', 'publication_date']:
-                metadata['publication_date'] = tag.get('content')
-                break
-            if tag.name == 'time' and tag.get('datetime'):
-                metadata['publication_date'] = tag.get('datetime')
-                break
-
-        # Try to extract authors
-        author_tags = soup.find_all(['meta', 'a', 'span', 'div'])
         authors = []
 
-        for tag in author_tags:
-            # Check meta tags
-            if tag.name == 'meta' and tag.get('name') in ['author', 'citation_author']:
-                authors.append(tag.get('content'))
-
-            # Check for author links or spans
-            if tag.name in ['a', 'span', 'div'] and tag.get('class'):
-                if any(c in str(tag.get('class')) for c in ['author', 'creator', 'contributor']):
-                    authors.append(tag.get_text(strip=True))
+        # Elements come back in document order, so the first title and the
+        # first date found win
+        for tag in soup.select(_METADATA_SELECTOR):
+            if tag.name == 'title':
+                metadata.setdefault('title', tag.get_text(strip=True))
+            elif tag.name == 'meta':
+                if tag.get('name') in _AUTHOR_META_NAMES:
+                    authors.append(tag.get('content'))
+                else:
+                    metadata.setdefault('publication_date', tag.get('content'))
+            elif tag.name == 'time':
+                if tag.get('datetime'):
+                    metadata.setdefault('publication_date', tag.get('datetime'))
+            else:
+                authors.append(tag.get_text(strip=True))
 
         if authors:
-            metadata['authors'] = ', '.join(list(set(authors)))
+            # Deduplicated in document order, so the same page always yields the same text
+            metadata['authors'] = ', '.join(dict.fromkeys(authors))
 
         return metadata
 
     # Main execution
     try:
-        # Make the request
-        response = requests.get(url, headers=headers, timeout=SCRAPE_TIMEOUT)
-        response.raise_for_status()
+        # Make the request; the body is only downloaded once it is known to be HTML
+        with _SESSION.get(url, timeout=SCRAPE_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+
+            # Check if content is HTML
+            content_type = response.headers.get('Content-Type', '')
+            if 'text/html' not in content_type and 'application/xhtml+xml' not in content_type:
+                return f"URL does not contain HTML content. Content-Type: {content_type}"
 
-        # Check if content is HTML
-        content_type = response.headers.get('Content-Type', '')
-        if 'text/html' not in content_type and 'application/xhtml+xml' not in content_type:
-            return f"URL does not contain HTML content. Content-Type: {content_type}"
+            html = _read_capped(response)
 
         # Parse HTML
-        soup = BeautifulSoup(response.content, 'lxml')
+        soup = BeautifulSoup(html, 'lxml', parse_only=_PARSE_ONLY)
 
         # Extract content and metadata
-        content = extract_main_content(soup)
+        content = extract_main_content(soup, html)
         metadata = extract_metadata(soup)
 
+        # The tree's parent/child links form reference cycles that would
+        # otherwise wait for the cyclic garbage collector; free it right away
+        soup.decompose()
+
         # Format the output
         output = ""
 
@@ -170,6 +249,8 @@ def scrape_website_func(url: str) -> str:
                 output += f"Content:\n{content}"
 
         logger.info(f"Successfully scraped website: {url}")
+        if TOOL_CACHE_TTL > 0:
+            llm_cache.put(cache_key, output)
         return output
 
     except requests.exceptions.Timeout:
@@ -186,9 +267,48 @@ def scrape_website_func(url: str) -> str:
         logger.error(error_msg)
         return error_msg
 
+def scrape_websites(urls: List[str]) -> List[str]:
+    """
+    Scrape several URLs concurrently.
+
+    Fetches overlap on the shared session's connection pool, so the batch
+    takes about as long as the slowest page rather than the sum of all.
+
+    Args:
+        urls: The URLs to scrape
+
+    Returns:
+        List[str]: Extracted content or error message per URL, in input order
+    """
+    if len(urls) <= 1:
+        return [scrape_website_func(url) for url in urls]
+
+    with ThreadPoolExecutor(max_workers=min(SCRAPE_MAX_PARALLEL, len(urls))) as executor:
+        return list(executor.map(scrape_website_func, urls))
+
+
+def scrape_website_input(tool_input: str) -> str:
+    """
+    Scrape the whitespace-separated URL(s) given to the tool.
+
+    Args:
+        tool_input: One URL, or several separated by whitespace
+
+    Returns:
+        str: Extracted content, one section per URL
+    """
+    urls = tool_input.split()
+    if len(urls) <= 1:
+        return scrape_website_func(tool_input.strip())
+
+    return "\n\n".join(
+        f"=== {url} ===\n{result}" for url, result in zip(urls, scrape_websites(urls))
+    )
+
 # Create the tool
 scrape_website = create_tool(
-    func=scrape_website_func,
+    func=scrape_website_input,
     name="scrape_website",
-    description="Extract text content from a website URL. Particularly useful for scientific papers and research articles."
+    description="Extract text content from a website URL. Particularly useful for scientific papers and research articles. "
+                "Pass several URLs separated by spaces to scrape them all at once."
 )
\ No newline at end of file
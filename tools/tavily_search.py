@@ -2,23 +2,115 @@
 Tool for searching scientific and research content using the Tavily API.
 """
 import os
+import functools
 import logging
+import re
+import datetime
+import threading
 import json
-from typing import Dict, Any, List, Optional
-from tavily import TavilyClient
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional
 
 # Import from the base_tool module directly to avoid circular imports
 from tools.base_tool import create_tool
+from utils import llm_cache
 
 # Import configuration
 from config.settings import (
     TAVILY_API_KEY,
     SEARCH_MAX_RESULTS,
-    SEARCH_MAX_PAGES
+    SEARCH_MAX_PAGES,
+    SEARCH_MAX_PARALLEL,
+    TAVILY_USE_CACHE,
+    TOOL_CACHE_TTL,
+    TOOL_CACHE_TTL_RECENT
 )
 
 logger = logging.getLogger(__name__)
 
+# Include domains focused on academic sources
+_INCLUDE_DOMAINS = (
+    "scholar.google.com",
+    "arxiv.org",
+    "academia.edu",
+    "researchgate.net",
+    "sciencedirect.com",
+    "nature.com",
+    "science.org",
+    "pubmed.ncbi.nlm.nih.gov",
+    "ieee.org",
+    "acm.org",
+    "jstor.org"
+)
+
+# Queries mentioning any of these already target research content
+_ACADEMIC_TERMS_RE = re.compile("research|paper|study|journal|publication|article", re.IGNORECASE)
+
+# Queries asking for what is new right now are never served from the cache
+_TIME_SENSITIVE_RE = re.compile(r"\b(latest|today|breaking|current|now|this (week|month))\b", re.IGNORECASE)
+
+
+def _cache_ttl(query: str) -> int:
+    """
+    Decide how long search results for a query may be reused.
+
+    Args:
+        query: The search query
+
+    Returns:
+        int: Seconds a cached result stays valid; 0 if the query must not be cached
+    """
+    if _TIME_SENSITIVE_RE.search(query):
+        return 0
+    # A query naming this year or last year is after recent work, which changes quickly
+    year = datetime.date.today().year
+    if str(year) in query or str(year - 1) in query:
+        return min(TOOL_CACHE_TTL, TOOL_CACHE_TTL_RECENT)
+    return TOOL_CACHE_TTL
+
+# Extra search parameters; the client forwards them in the request body
+_SEARCH_OPTIONS = {"use_cache": True} if TAVILY_USE_CACHE else {}
+
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str):
+    """Return a shared Tavily client for an API key, importing the SDK on first use."""
+    from tavily import TavilyClient
+    return TavilyClient(api_key=api_key)
+
+# Searches currently in flight, by cache key
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _single_flight(key: str, func: Callable[[], Any]) -> Any:
+    """
+    Run func once for concurrent callers with the same key.
+
+    The first caller performs the call; callers arriving while it is in
+    flight wait for and share its result (or exception).
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+
+    if not leader:
+        logger.info("Waiting for an identical search already in flight")
+        return future.result()
+
+    try:
+        result = func()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
 def tavily_search_func(query: str) -> str:
     """
     Search for scientific papers, research articles, and academic content.
@@ -44,38 +136,36 @@ def tavily_search_func(query: str) -> str:
     search_depth = "advanced"
     include_answer = True
 
-    # Include domains focused on academic sources
-    include_domains = [
-        "scholar.google.com",
-        "arxiv.org",
-        "academia.edu",
-        "researchgate.net",
-        "sciencedirect.com",
-        "nature.com",
-        "science.org",
-        "pubmed.ncbi.nlm.nih.gov",
-        "ieee.org",
-        "acm.org",
-        "jstor.org"
-    ]
-
     # Optimize query for research papers if needed
-    academic_terms = ["research", "paper", "study", "journal", "publication", "article"]
-    has_academic_terms = any(term in query.lower() for term in academic_terms)
-    optimized_query = f"{query} research papers" if not has_academic_terms else query
+    optimized_query = query if _ACADEMIC_TERMS_RE.search(query) else f"{query} research papers"
+
+    # Identical (or, with semantic matching enabled, near-identical) searches
+    # made recently are served from the disk cache
+    cache_scope = llm_cache.make_key("tavily_search", search_depth, max_results, _INCLUDE_DOMAINS)
+    # Case and spacing don't change the results, so they don't split the cache
+    cache_key = llm_cache.make_key(cache_scope, " ".join(optimized_query.lower().split()))
+    cache_ttl = _cache_ttl(optimized_query)
+    if cache_ttl > 0:
+        cached = llm_cache.get(cache_key, max_age=cache_ttl)
+        if cached is llm_cache.MISS:
+            cached = llm_cache.get_similar(cache_scope, optimized_query, max_age=cache_ttl)
+        if cached is not llm_cache.MISS:
+            logger.info(f"Using cached search results for: {query}")
+            return cached
 
     try:
-        # Initialize client
-        client = TavilyClient(api_key=api_key)
+        # Reuse the client (and its connection pool) for this API key
+        client = _get_client(api_key)
 
-        # Perform the search
-        search_results = client.search(
+        # Perform the search; concurrent identical searches share one request
+        search_results = _single_flight(cache_key, lambda: client.search(
             query=optimized_query,
             search_depth=search_depth,
             max_results=max_results,
             include_answer=include_answer,
-            include_domains=include_domains
-        )
+            include_domains=_INCLUDE_DOMAINS,
+            **_SEARCH_OPTIONS
+        ))
 
         # Process results
         output = []
@@ -85,7 +175,8 @@ def tavily_search_func(query: str) -> str:
             output.append(f"Tavily Answer: {search_results['answer']}\n")
 
         # Add individual search results
-        if "results" in search_results and search_results["results"]:
+        has_results = bool(search_results.get("results"))
+        if has_results:
             output.append("Search Results:")
 
             for i, result in enumerate(search_results["results"], 1):
@@ -94,26 +185,69 @@ def tavily_search_func(query: str) -> str:
                 url = result.get("url", "No URL")
                 score = result.get("score", 0)
 
-                result_text = f"\n{i}. {title}\n"
-                result_text += f"   URL: {url}\n"
-                result_text += f"   Relevance Score: {score:.2f}\n"
-                result_text += f"   Summary: {content[:300]}...\n"
-
-                output.append(result_text)
+                output.append(
+                    f"\n{i}. {title}\n"
+                    f"   URL: {url}\n"
+                    f"   Relevance Score: {score:.2f}\n"
+                    f"   Summary: {content[:300]}...\n"
+                )
         else:
             output.append("No search results found.")
 
         logger.info(f"Search completed successfully for: {query}")
-        return "\n".join(output)
+        output = "\n".join(output)
+        # Empty result sets are not cached, so a retry can still find something
+        if cache_ttl > 0 and has_results:
+            llm_cache.put(cache_key, output, scope=cache_scope, text=optimized_query)
+        return output
 
     except Exception as e:
         error_msg = f"Error searching Tavily: {str(e)}"
         logger.error(error_msg)
         return error_msg
 
+def tavily_search_many(queries: List[str]) -> List[str]:
+    """
+    Run several searches concurrently.
+
+    At most SEARCH_MAX_PARALLEL requests are in flight at once, to stay
+    within the API's rate limits.
+
+    Args:
+        queries: The search queries
+
+    Returns:
+        List[str]: Formatted search results per query, in input order
+    """
+    if len(queries) <= 1:
+        return [tavily_search_func(query) for query in queries]
+
+    with ThreadPoolExecutor(max_workers=min(SEARCH_MAX_PARALLEL, len(queries))) as executor:
+        return list(executor.map(tavily_search_func, queries))
+
+
+def tavily_search_input(tool_input: str) -> str:
+    """
+    Search for the newline-separated query or queries given to the tool.
+
+    Args:
+        tool_input: One query, or several on separate lines
+
+    Returns:
+        str: Formatted search results, one section per query
+    """
+    queries = [line.strip() for line in tool_input.splitlines() if line.strip()]
+    if len(queries) <= 1:
+        return tavily_search_func(tool_input.strip())
+
+    return "\n\n".join(
+        f"=== {query} ===\n{result}" for query, result in zip(queries, tavily_search_many(queries))
+    )
+
 # Create the tool
 tavily_search = create_tool(
-    func=tavily_search_func,
+    func=tavily_search_input,
     name="tavily_search",
-    description="Search for scientific papers, research articles, and academic content."
+    description="Search for scientific papers, research articles, and academic content. "
+                "Put several queries on separate lines to run them all at once."
 )
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Email utilities for the research proposal generation system.
+
+This module provides the SMTP connection used to deliver generated proposals.
+"""
+
+import re
+import smtplib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Bare CR or LF line endings, normalized to CRLF as SMTP requires
+_LINE_ENDING_RE = re.compile(r"\r\n|\n|\r(?!\n)")
+
+# Leading periods, which are doubled so they can't end the message early
+_LEADING_PERIOD_RE = re.compile(rb"^\.", re.MULTILINE)
+
+
+class PipelinedSMTP(smtplib.SMTP):
+    """
+    SMTP client that pipelines the envelope commands (RFC 2920).
+
+    When the server advertises PIPELINING, MAIL FROM, every RCPT TO and DATA
+    are written in a single send and their replies are read afterwards, so
+    a message costs one round-trip for the envelope instead of one per
+    command. Servers without the extension fall back to stock smtplib.
+    """
+
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=(), rcpt_options=()):
+        self.ehlo_or_helo_if_needed()
+
+        mail_options = list(mail_options)
+        if (not self.has_extn("pipelining")
+                or any(option.lower() == "smtputf8" for option in mail_options)):
+            return super().sendmail(from_addr, to_addrs, msg, mail_options, rcpt_options)
+
+        if isinstance(msg, str):
+            msg = _LINE_ENDING_RE.sub(smtplib.CRLF, msg).encode("ascii")
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+
+        esmtp_opts = []
+        if self.has_extn("size"):
+            esmtp_opts.append("size=%d" % len(msg))
+        esmtp_opts.extend(mail_options)
+
+        mail_args = "".join(" " + option for option in esmtp_opts)
+        rcpt_args = "".join(" " + option for option in rcpt_options)
+
+        commands = ["mail FROM:%s%s" % (smtplib.quoteaddr(from_addr), mail_args)]
+        commands.extend("rcpt TO:%s%s" % (smtplib.quoteaddr(addr), rcpt_args) for addr in to_addrs)
+        commands.append("data")
+        self.send("".join(command + smtplib.CRLF for command in commands))
+
+        # Replies arrive in command order and must all be read before reacting
+        mail_code, mail_resp = self.getreply()
+        refused = {}
+        for addr in to_addrs:
+            code, resp = self.getreply()
+            if code not in (250, 251):
+                refused[addr] = (code, resp)
+        data_code, data_resp = self.getreply()
+
+        envelope_ok = mail_code == 250 and len(refused) < len(to_addrs)
+        if data_code == 354 and not envelope_ok:
+            # The server accepted DATA even though the envelope failed; RFC 2920
+            # requires ending it with an empty message, or the RSET below would
+            # be read as the message body
+            self.send(b"." + smtplib.bCRLF)
+            self.getreply()
+
+        if mail_code != 250:
+            self._reset_quietly()
+            if mail_code == 421:
+                self.close()
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+
+        if len(refused) == len(to_addrs):
+            self._reset_quietly()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+        if data_code != 354:
+            self._reset_quietly()
+            raise smtplib.SMTPDataError(data_code, data_resp)
+
+        payload = _LEADING_PERIOD_RE.sub(b"..", msg)
+        if payload[-2:] != smtplib.bCRLF:
+            payload += smtplib.bCRLF
+        self.send(payload + b"." + smtplib.bCRLF)
+
+        code, resp = self.getreply()
+        if code != 250:
+            self._reset_quietly()
+            raise smtplib.SMTPDataError(code, resp)
+
+        return refused
+
+    def _reset_quietly(self):
+        """Send RSET, ignoring a server that has already disconnected."""
+        try:
+            self.rset()
+        except smtplib.SMTPServerDisconnected:
+            pass
+
+
+class SMTPConnection:
+    """A logged-in SMTP connection reused across sends and reopened when stale."""
+
+    # Reconnect after this many messages to stay under per-session server limits
+    MAX_MESSAGES_PER_CONNECTION = 10000
+
+    def __init__(self, server, port, sender, password, timeout=30):
+        self.server = server
+        self.port = port
+        self.sender = sender
+        self.password = password
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self._conn = None
+        self._sent = 0
+
+    def _connect(self):
+        conn = PipelinedSMTP(self.server, self.port, timeout=self.timeout)
+        conn.starttls()
+        conn.login(self.sender, self.password)
+        self._conn = conn
+        self._sent = 0
+
+    def _is_alive(self):
+        try:
+            return self._conn.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def send_message(self, msg):
+        """Send a message, reconnecting first if the cached connection is unusable."""
+        with self.lock:
+            if (self._conn is None or self._sent >= self.MAX_MESSAGES_PER_CONNECTION
+                    or not self._is_alive()):
+                self.close()
+                self._connect()
+            try:
+                self._conn.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # The server dropped the connection between the NOOP and the send
+                self._connect()
+                self._conn.send_message(msg)
+            self._sent += 1
+
+    def close(self):
+        """Close the connection if one is open."""
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._conn = None
@@ -5,11 +5,14 @@ This module provides common utility functions used throughout the system.
 """
 
 import os
+import re
 import json
-import yaml
+import orjson
+import json_repair
+import functools
+import hashlib
 import logging
 from typing import Dict, Any, Optional, Union
-from jsonschema import validate, ValidationError
 from pathlib import Path
 
 # Import configuration
@@ -17,91 +20,54 @@ from config.settings import PROMPTS_DIR, JSON_OUTPUT_INDENT
 
 logger = logging.getLogger(__name__)
 
+# Characters that are not Unicode alphanumerics (\W also keeps "_", which maps to itself)
+_NON_ALNUM_RE = re.compile(r"\W")
+
+# Pretty-printed orjson output; non-string keys are stringified like json.dumps does
+_ORJSON_INDENT_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
 
 def validate_json_output(json_input, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Validate JSON output against a schema and fix common issues.
 
+    Well-formed JSON is parsed directly with orjson; anything else (text
+    around the JSON, markdown code fences, unquoted keys, trailing commas,
+    truncated output) is passed through json_repair first.
+
     Args:
-        json_input: JSON input (can be string, dict, or CrewOutput)
+        json_input: JSON input (can be string, dict, list, or CrewOutput)
         schema: Optional JSON schema to validate against
 
     Returns:
         Dict[str, Any]: Parsed and validated JSON
 
     Raises:
-        ValueError: If JSON is invalid and cannot be fixed
+        ValueError: If a string input is invalid JSON and cannot be fixed
     """
-    # If input is already a dict, use it directly
-    if isinstance(json_input, dict):
+    # If input is already parsed, use it directly
+    if isinstance(json_input, (dict, list)):
         parsed_json = json_input
-    # If input is a string, parse it
-    elif isinstance(json_input, str):
-        try:
-            # Try to parse the JSON
-            parsed_json = json.loads(json_input)
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON parse error: {str(e)}")
-            # Try to fix common JSON formatting issues
-            try:
-                # Sometimes LLMs produce invalid JSON with extra text before/after
-                # Try to extract just the JSON part with { } or [ ]
-                if '{' in json_input and '}' in json_input:
-                    start_idx = json_input.find('{')
-                    end_idx = json_input.rfind('}') + 1
-                    fixed_json_str = json_input[start_idx:end_idx]
-                    return json.loads(fixed_json_str)
-
-                elif '[' in json_input and ']' in json_input:
-                    start_idx = json_input.find('[')
-                    end_idx = json_input.rfind(']') + 1
-                    fixed_json_str = json_input[start_idx:end_idx]
-                    return json.loads(fixed_json_str)
-
-                # Fix missing quotes around keys
-                if ': ' in json_input and not '"' in json_input:
-                    import re
-                    fixed_json_str = re.sub(r'(\w+):\s', r'"\1": ', json_input)
-                    return json.loads(fixed_json_str)
-
-                raise ValueError(f"Failed to fix JSON: {json_input[:100]}...")
-
-            except (json.JSONDecodeError, ValueError) as fix_error:
-                logger.error(f"Failed to fix JSON: {str(fix_error)}")
-                raise ValueError(f"Invalid JSON output: {str(e)}. Could not automatically fix.")
-    # Handle CrewOutput or other objects
     else:
-        # Try to get string representation and parse it
+        # Handle strings, CrewOutput or other objects through their string representation
+        json_str = json_input if isinstance(json_input, str) else str(json_input)
         try:
-            json_str = str(json_input)
-
-            # Check if it's a markdown code block with JSON
-            if "```json" in json_str and "```" in json_str[json_str.find("```json")+7:]:
-                # Extract JSON from markdown
-                json_start = json_str.find("```json") + 7
-                json_end = json_str.find("```", json_start)
-                json_str = json_str[json_start:json_end].strip()
-
-            # Try to find JSON-like content in the string
-            elif '[' in json_str and ']' in json_str:
-                start_idx = json_str.find('[')
-                end_idx = json_str.rfind(']') + 1
-                json_str = json_str[start_idx:end_idx]
-            elif '{' in json_str and '}' in json_str:
-                start_idx = json_str.find('{')
-                end_idx = json_str.rfind('}') + 1
-                json_str = json_str[start_idx:end_idx]
-
-            # Parse the extracted string
-            parsed_json = json.loads(json_str)
-
-        except (ValueError, json.JSONDecodeError) as e:
-            logger.error(f"Failed to parse object as JSON: {str(e)}")
-            # Return the original object if we can't parse it
-            return json_input
+            parsed_json = orjson.loads(json_str)
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"JSON parse error, attempting repair: {str(e)}")
+            parsed_json = json_repair.repair_json(json_str, return_objects=True)
+
+            if not isinstance(parsed_json, (dict, list)) or not parsed_json:
+                logger.error(f"Failed to fix JSON: {json_str[:100]}...")
+                if not isinstance(json_input, str):
+                    # Return the original object if we can't parse it
+                    return json_input
+                raise ValueError(f"Invalid JSON output: {str(e)}. Could not automatically fix.")
 
     # If schema is provided, validate against it
     if schema and parsed_json:
+        # jsonschema is slow to import and most callers don't pass a schema
+        from jsonschema import validate, ValidationError
         try:
             validate(instance=parsed_json, schema=schema)
         except ValidationError as e:
@@ -111,10 +77,42 @@ def validate_json_output(json_input, schema: Optional[Dict[str, Any]] = None) ->
     return parsed_json
 
 
+@functools.lru_cache(maxsize=1)
+def _load_all_templates() -> Dict[str, Any]:
+    """
+    Read and parse the templates file.
+
+    Cached, so the YAML is parsed once per process no matter how many
+    templates are loaded from it.
+
+    Raises:
+        FileNotFoundError: If the template file doesn't exist
+        ValueError: If the template file is not valid YAML
+    """
+    template_file = PROMPTS_DIR / "templates.yaml"
+
+    if not template_file.exists():
+        logger.error(f"Template file not found: {template_file}")
+        raise FileNotFoundError(f"Template file not found: {template_file}")
+
+    # Imported here; only the first template load needs the YAML parser
+    import yaml
+
+    try:
+        with open(template_file, 'r') as f:
+            return yaml.safe_load(f)
+    except yaml.YAMLError as e:
+        logger.error(f"Error parsing templates file: {str(e)}")
+        raise ValueError(f"Error parsing templates file: {str(e)}")
+
+
 def load_prompt_template(template_name: str) -> str:
     """
     Load a prompt template from the templates file.
 
+    The file is read and parsed at most once for the lifetime of the
+    process; later calls are a dictionary lookup.
+
     Args:
         template_name: Name of the template to load
 
@@ -125,31 +123,32 @@ def load_prompt_template(template_name: str) -> str:
         FileNotFoundError: If the template file doesn't exist
         KeyError: If the template name doesn't exist in the file
     """
-    template_file = PROMPTS_DIR / "templates.yaml"
+    templates = _load_all_templates()
 
-    if not template_file.exists():
-        logger.error(f"Template file not found: {template_file}")
-        raise FileNotFoundError(f"Template file not found: {template_file}")
+    if template_name not in templates:
+        logger.error(f"Template not found: {template_name}")
+        raise KeyError(f"Template '{template_name}' not found in templates file")
 
-    try:
-        with open(template_file, 'r') as f:
-            templates = yaml.safe_load(f)
+    template = templates[template_name]
 
-        if template_name not in templates:
-            logger.error(f"Template not found: {template_name}")
-            raise KeyError(f"Template '{template_name}' not found in templates file")
+    # If the template is a dict with a 'system' key (or others), return the 'system' part
+    if isinstance(template, dict) and 'system' in template:
+        return template['system']
 
-        template = templates[template_name]
+    return template
 
-        # If the template is a dict with a 'system' key (or others), return the 'system' part
-        if isinstance(template, dict) and 'system' in template:
-            return template['system']
 
-        return template
+def prompt_version(prompt: str) -> str:
+    """
+    Compute a short, stable version id for a prompt.
 
-    except yaml.YAMLError as e:
-        logger.error(f"Error parsing templates file: {str(e)}")
-        raise ValueError(f"Error parsing templates file: {str(e)}")
+    Args:
+        prompt: The prompt text
+
+    Returns:
+        str: The first 12 hex digits of the prompt's SHA-256 digest
+    """
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
 
 
 def format_json_output(data: Dict[str, Any]) -> str:
@@ -162,9 +161,25 @@ def format_json_output(data: Dict[str, Any]) -> str:
     Returns:
         str: Pretty-printed JSON string
     """
+    # orjson serializes in C but only supports two-space indentation
+    if JSON_OUTPUT_INDENT == 2:
+        return orjson.dumps(data, option=_ORJSON_INDENT_OPTIONS).decode("utf-8")
     return json.dumps(data, indent=JSON_OUTPUT_INDENT, ensure_ascii=False)
 
 
+def clean_filename(title: str) -> str:
+    """
+    Turn a title into a lowercase, filesystem-safe file name stem.
+
+    Args:
+        title: The title to clean
+
+    Returns:
+        str: The title with every non-alphanumeric character replaced by "_"
+    """
+    return _NON_ALNUM_RE.sub("_", title).lower()
+
+
 def save_research_proposal(proposal_data: Dict[str, Any], output_dir: str = "output") -> str:
     """
     Save a research proposal to a file.
@@ -181,15 +196,19 @@ def save_research_proposal(proposal_data: Dict[str, Any], output_dir: str = "out
 
     # Generate a filename based on the proposal title
     title = proposal_data.get("proposal_title", "research_proposal")
-    clean_title = "".join(c if c.isalnum() else "_" for c in title).lower()
+    clean_title = clean_filename(title)
     timestamp = proposal_data.get("timestamp", "")
 
     filename = f"{clean_title}_{timestamp}.json" if timestamp else f"{clean_title}.json"
     filepath = os.path.join(output_dir, filename)
 
-    # Save the proposal
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(proposal_data, f, indent=JSON_OUTPUT_INDENT, ensure_ascii=False)
+    # Save the proposal; orjson writes UTF-8 bytes directly
+    if JSON_OUTPUT_INDENT == 2:
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(proposal_data, option=_ORJSON_INDENT_OPTIONS))
+    else:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(proposal_data, f, indent=JSON_OUTPUT_INDENT, ensure_ascii=False)
 
     logger.info(f"Saved research proposal to {filepath}")
     return filepath
@@ -212,8 +231,8 @@ def load_research_proposal(filepath: str) -> Dict[str, Any]:
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"Proposal file not found: {filepath}")
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        proposal_data = json.load(f)
+    with open(filepath, 'rb') as f:
+        proposal_data = orjson.loads(f.read())
 
     logger.info(f"Loaded research proposal from {filepath}")
     return proposal_data
\ No newline at end of file
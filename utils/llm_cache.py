@@ -0,0 +1,211 @@
+"""
+Disk cache for pipeline results.
+
+Entries are JSON files named after the SHA-256 of their key material, so a
+result is reused only when every input that produced it (model settings,
+prompt templates, the task's rendered description) is unchanged.
+
+Optionally, entries can also be matched semantically: the text given to
+put is embedded and a stored result is reused when a previous text in the
+same scope is at least RESULT_CACHE_SIMILARITY cosine-similar. Only pass
+short, fully dynamic text (such as a search query); text that is mostly
+fixed boilerplate makes unrelated inputs look alike.
+"""
+
+import os
+import json
+import math
+import time
+import hashlib
+import logging
+import tempfile
+import functools
+import threading
+from typing import Any, Optional
+
+from config.settings import (
+    PROMPTS_DIR,
+    RESULT_CACHE_DIR,
+    RESULT_CACHE_ENABLED,
+    RESULT_CACHE_SIMILARITY,
+    RESULT_CACHE_EMBEDDING_MODEL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Sentinel returned on a cache miss, since None is a valid cached value
+MISS = object()
+
+# Embeddings of cached task texts, one JSON object per line
+_EMBEDDING_INDEX = RESULT_CACHE_DIR / "embeddings.jsonl"
+_index_lock = threading.Lock()
+
+
+def make_key(*parts) -> str:
+    """
+    Derive a content-addressed cache key from arbitrary key material.
+
+    Args:
+        *parts: JSON-serialisable values identifying the result
+
+    Returns:
+        str: Hex digest identifying the entry
+    """
+    material = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def prompts_fingerprint() -> str:
+    """
+    Hash the prompt template files, so editing a prompt invalidates the cache.
+
+    Returns:
+        str: Hex digest over the names and contents of the prompt templates
+    """
+    digest = hashlib.sha256()
+    for path in sorted(PROMPTS_DIR.glob("*.yaml")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def get(key: str, max_age: Optional[float] = None) -> Any:
+    """
+    Look up a cached result.
+
+    Args:
+        key: Key returned by make_key
+        max_age: Optional age in seconds after which an entry is treated as missing
+
+    Returns:
+        The cached value, or MISS if there is no usable entry
+    """
+    if not RESULT_CACHE_ENABLED:
+        return MISS
+
+    path = RESULT_CACHE_DIR / f"{key}.json"
+    try:
+        if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+            return MISS
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return MISS
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable cache entry %s: %s", path, e)
+        return MISS
+
+
+def put(key: str, value: Any, scope: Optional[str] = None, text: Optional[str] = None) -> Optional[str]:
+    """
+    Store a result in the cache.
+
+    The entry is written to a temporary file and renamed into place, so
+    concurrent readers never see a partially written file.
+
+    Args:
+        key: Key returned by make_key
+        value: JSON-serialisable result; other objects are stored as strings
+        scope: Key material a semantic match must share exactly (e.g. model settings)
+        text: Task text to index for semantic lookups; ignored unless enabled
+
+    Returns:
+        Optional[str]: Path of the cache entry, or None if caching is disabled or failed
+    """
+    if not RESULT_CACHE_ENABLED:
+        return None
+
+    if not isinstance(value, (dict, list, str, int, float, bool)) and value is not None:
+        value = str(value)
+
+    tmp_path = None
+    try:
+        os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=RESULT_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        path = RESULT_CACHE_DIR / f"{key}.json"
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("Could not write cache entry for %s: %s", key, e)
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+    if text is not None and RESULT_CACHE_SIMILARITY > 0:
+        _index_embedding(key, scope, text)
+    return str(path)
+
+
+def get_similar(scope: Optional[str], text: str, max_age: Optional[float] = None) -> Any:
+    """
+    Look up the result of the most similar previously cached task.
+
+    Args:
+        scope: Key material the match must share exactly (e.g. model settings)
+        text: Task text to compare against the indexed entries
+        max_age: Optional age in seconds after which the matched entry is treated as missing
+
+    Returns:
+        The cached value of the best match at or above RESULT_CACHE_SIMILARITY,
+        or MISS if semantic matching is disabled or nothing is close enough
+    """
+    if not RESULT_CACHE_ENABLED or RESULT_CACHE_SIMILARITY <= 0:
+        return MISS
+
+    try:
+        embedding = _embed(text)
+    except Exception as e:
+        logger.warning("Could not embed task text for semantic cache lookup: %s", e)
+        return MISS
+
+    best_key, best_score = None, RESULT_CACHE_SIMILARITY
+    for entry in _read_index():
+        if entry.get("scope") != scope:
+            continue
+        score = _cosine(embedding, entry["embedding"])
+        if score >= best_score:
+            best_key, best_score = entry["key"], score
+
+    if best_key is None:
+        return MISS
+
+    logger.info("Semantic cache hit %s (similarity %.3f)", best_key, best_score)
+    return get(best_key, max_age)
+
+
+@functools.lru_cache(maxsize=64)
+def _embed(text: str) -> tuple:
+    """Embed whitespace- and case-normalised text with the configured model."""
+    import litellm
+
+    normalized = " ".join(text.lower().split())
+    response = litellm.embedding(model=RESULT_CACHE_EMBEDDING_MODEL, input=[normalized])
+    return tuple(response.data[0]["embedding"])
+
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _index_embedding(key: str, scope: Optional[str], text: str) -> None:
+    try:
+        line = json.dumps({"key": key, "scope": scope, "embedding": list(_embed(text))})
+        with _index_lock, open(_EMBEDDING_INDEX, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except Exception as e:
+        logger.warning("Could not index cache entry %s for semantic lookups: %s", key, e)
+
+
+def _read_index():
+    try:
+        with open(_EMBEDDING_INDEX, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        return
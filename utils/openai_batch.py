@@ -0,0 +1,158 @@
+"""
+OpenAI Batch API helpers for non-interactive runs.
+
+Batched chat completions are billed at a discount and are not subject to
+the real-time rate limits, at the cost of completing asynchronously
+(within the batch's completion window rather than in seconds).
+"""
+
+import io
+import json
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+# Batch states after which no further progress will be made
+_FINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _get_client(client=None):
+    if client is not None:
+        return client
+    from openai import OpenAI
+    return OpenAI()
+
+
+def build_request(custom_id: str, messages: List[Dict[str, str]], model: str,
+                  temperature: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Build one line of a chat-completions batch input file.
+
+    Args:
+        custom_id: Identifier used to match the result to the request
+        messages: Chat messages for the completion
+        model: Model name, e.g. "gpt-4o"
+        temperature: Optional sampling temperature
+
+    Returns:
+        Dict[str, Any]: The batch request object
+    """
+    body = {"model": model, "messages": messages}
+    if temperature is not None:
+        body["temperature"] = temperature
+    return {"custom_id": custom_id, "method": "POST", "url": CHAT_COMPLETIONS_ENDPOINT, "body": body}
+
+
+def submit_batch(requests: List[Dict[str, Any]], client=None) -> str:
+    """
+    Upload batch requests as a JSONL file and create a batch for them.
+
+    Args:
+        requests: Request objects returned by build_request
+        client: Optional OpenAI client; one is created from the environment if omitted
+
+    Returns:
+        str: The batch id
+    """
+    client = _get_client(client)
+
+    payload = "".join(json.dumps(request) + "\n" for request in requests).encode("utf-8")
+    input_file = client.files.create(file=("batch_input.jsonl", io.BytesIO(payload)), purpose="batch")
+
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=CHAT_COMPLETIONS_ENDPOINT,
+        completion_window="24h"
+    )
+    logger.info("Submitted batch %s with %d requests", batch.id, len(requests))
+    return batch.id
+
+
+def wait_for_batch(batch_id: str, poll_interval: float = 30, client=None, timeout: Optional[float] = None):
+    """
+    Poll a batch until it reaches a final state.
+
+    Args:
+        batch_id: Id returned by submit_batch
+        poll_interval: Seconds between status checks
+        client: Optional OpenAI client
+        timeout: Optional number of seconds to wait before cancelling the batch
+
+    Returns:
+        The final batch object
+
+    Raises:
+        RuntimeError: If the batch did not complete successfully
+        TimeoutError: If the batch did not finish within `timeout` seconds
+    """
+    client = _get_client(client)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in _FINAL_STATES:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            logger.error("Batch %s still %s after %ss, cancelling it", batch_id, batch.status, timeout)
+            try:
+                client.batches.cancel(batch_id)
+            except Exception as e:
+                logger.warning("Could not cancel batch %s: %s", batch_id, e)
+            raise TimeoutError(f"Batch {batch_id} did not finish within {timeout} seconds")
+        logger.info("Batch %s is %s (%s)", batch_id, batch.status, batch.request_counts)
+        time.sleep(poll_interval if deadline is None else max(0, min(poll_interval, deadline - time.monotonic())))
+
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+    return batch
+
+
+def download_results(batch, client=None) -> Dict[str, Optional[str]]:
+    """
+    Download the output of a completed batch.
+
+    Args:
+        batch: Completed batch object returned by wait_for_batch
+        client: Optional OpenAI client
+
+    Returns:
+        Dict[str, Optional[str]]: Completion text per custom_id; None for failed requests
+    """
+    client = _get_client(client)
+
+    results = {}
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+            else:
+                logger.error("Batch request %s failed: %s", record["custom_id"], record.get("error"))
+                results[record["custom_id"]] = None
+    return results
+
+
+def run_batch(requests: List[Dict[str, Any]], poll_interval: float = 30, client=None,
+              timeout: Optional[float] = None) -> Dict[str, Optional[str]]:
+    """
+    Submit batch requests, wait for them to finish and return the completions.
+
+    Args:
+        requests: Request objects returned by build_request
+        poll_interval: Seconds between status checks
+        client: Optional OpenAI client
+        timeout: Optional number of seconds to wait before cancelling the batch
+
+    Returns:
+        Dict[str, Optional[str]]: Completion text per custom_id; None for failed requests
+    """
+    client = _get_client(client)
+    batch = wait_for_batch(submit_batch(requests, client), poll_interval, client, timeout)
+    return download_results(batch, client)
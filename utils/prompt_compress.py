@@ -0,0 +1,95 @@
+"""
+Compact serialization of structured context embedded in task prompts.
+
+Stage outputs repeat the same strings (mostly paper titles) across nested
+lists. compact_context serializes without whitespace and replaces each
+repeated string with a short reference, defined once in a legend, so the
+prompt carries fewer input tokens.
+"""
+
+import json
+from collections import Counter
+from typing import Any
+
+# Strings shorter than this are cheaper to repeat than to reference
+MIN_INTERNED_LENGTH = 16
+
+LEGEND_KEY = "_legend"
+
+# Tells the model how to read a legend; only added when one is present
+LEGEND_NOTE = (
+    "Values like \"@p0\" in the data below refer to entries of its \"_legend\"; "
+    "always write out the full text in your answer.\n"
+)
+
+
+def _iter_strings(obj):
+    if isinstance(obj, str):
+        yield obj
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from _iter_strings(value)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from _iter_strings(item)
+
+
+def _replace_strings(obj, references):
+    if isinstance(obj, str):
+        return references.get(obj, obj)
+    if isinstance(obj, dict):
+        return {key: _replace_strings(value, references) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_replace_strings(item, references) for item in obj]
+    return obj
+
+
+def _compact(obj: Any):
+    """Serialize obj compactly; returns the JSON text and whether a legend was added."""
+    counts = Counter(s for s in _iter_strings(obj) if len(s) >= MIN_INTERNED_LENGTH)
+    repeated = [s for s, count in counts.items() if count > 1]
+
+    if repeated:
+        references = {s: f"@p{i}" for i, s in enumerate(repeated)}
+        obj = {
+            LEGEND_KEY: {ref: s for s, ref in references.items()},
+            "data": _replace_strings(obj, references)
+        }
+
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False), bool(repeated)
+
+
+def compact_context(obj: Any) -> str:
+    """
+    Serialize a stage output compactly for inclusion in a task description.
+
+    Every string value of at least MIN_INTERNED_LENGTH characters that occurs
+    more than once is replaced by a reference such as "@p0". The references
+    are listed under "_legend". When a legend is needed, the data is wrapped
+    as {"_legend": {...}, "data": ...}.
+
+    Args:
+        obj: JSON-compatible stage output
+
+    Returns:
+        str: Compact JSON text
+    """
+    return _compact(obj)[0]
+
+
+def compact_context_block(obj: Any) -> str:
+    """
+    Serialize a stage output with compact_context, explaining the legend if there is one.
+
+    LEGEND_NOTE is prepended only when references were actually introduced,
+    so prompts without repeated strings don't describe a structure that
+    isn't there.
+
+    Args:
+        obj: JSON-compatible stage output
+
+    Returns:
+        str: Compact JSON text, preceded by LEGEND_NOTE when it has a legend
+    """
+    text, has_legend = _compact(obj)
+    return LEGEND_NOTE + text if has_legend else text
@@ -7,12 +7,72 @@ process and results in the Streamlit application.
 
 import streamlit as st
 import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
+import numpy as np
+import io
 import json
+import re
 from datetime import datetime
 
+# Timeline phases such as "Phase 1 (Month 1-3): Description"
+_TIMELINE_RE = re.compile(
+    r"(?P<phase>Phase \d+|[^:.(]+).*?(?P<start>\d+)[-–](?P<end>\d+).*?(?:month|months|week|weeks)",
+    re.IGNORECASE
+)
+
+# Fallback timeline when a proposal's timeline cannot be parsed
+_DEFAULT_TIMELINE = [
+    ("Literature Review", 1, 2),
+    ("Data Collection", 2, 5),
+    ("Analysis", 5, 8),
+    ("Validation", 8, 10),
+    ("Documentation", 10, 12)
+]
+
+# Paper networks up to this size are laid out on a circle instead of simulated;
+# with so few nodes every pair is already evenly spread, so the simulation
+# would add nothing. A typical run (5-7 papers) uses the force-directed layout.
+_CIRCULAR_LAYOUT_MAX_NODES = 3
+
+# Keywords used to score each methodology category, in radar chart order
+_METHODOLOGY_KEYWORDS = {
+    "Data Collection": ("survey", "interview", "dataset", "corpus", "collection"),
+    "Computational Methods": ("algorithm", "computation", "model", "simulation", "neural"),
+    "Experimental Design": ("experiment", "control", "variable", "trial", "condition"),
+    "Analysis Techniques": ("analysis", "statistical", "regression", "correlation", "significance"),
+    "Validation Approaches": ("validation", "accuracy", "precision", "recall", "evaluation")
+}
+
+_METHODOLOGY_CATEGORIES = tuple(_METHODOLOGY_KEYWORDS)
+
+# One alternation per category; keywords match anywhere, like a substring test
+_METHODOLOGY_PATTERNS = {
+    category: re.compile("|".join(map(re.escape, words)))
+    for category, words in _METHODOLOGY_KEYWORDS.items()
+}
+
+# Words left out of the proposal word cloud
+_WORDCLOUD_STOPWORDS = frozenset({
+    "the", "and", "to", "of", "a", "in", "that", "is", "for", "this", "will", "be", "on", "an", "with", "as"
+})
+
+
+def _stage_labels(stages):
+    """
+    Build the layout annotations labelling each workflow stage.
+
+    Args:
+        stages (list): Stage names, in workflow order
+
+    Returns:
+        list: Annotation dictionaries placed below each stage node
+    """
+    return [
+        dict(x=i, y=-0.15, text=stage, showarrow=False, font=dict(size=12))
+        for i, stage in enumerate(stages)
+    ]
+
 
+@st.cache_data(show_spinner=False)
 def create_workflow_diagram():
     """
     Create a visualization of the research proposal generation workflow.
@@ -29,45 +89,31 @@ def create_workflow_diagram():
         "Proposal Development"
     ]
 
-    # Create a figure
-    fig = go.Figure()
-
-    # Add nodes for each stage
-    for i, stage in enumerate(stages):
-        fig.add_trace(go.Scatter(
-            x=[i],
-            y=[0],
-            mode="markers+text",
-            marker=dict(size=30, color="#3B82F6", symbol="circle"),
-            text=[str(i + 1)],
-            textfont=dict(color="white", size=14),
-            name=stage,
-            hoverinfo="text",
-            hovertext=stage
-        ))
-
-    # Add connecting lines
-    fig.add_trace(go.Scatter(
+    # Create a figure with all stage nodes as a single trace
+    fig = go.Figure(data=[go.Scatter(
         x=list(range(len(stages))),
         y=[0] * len(stages),
-        mode="lines",
-        line=dict(width=3, color="#93C5FD"),
-        hoverinfo="skip"
-    ))
-
-    # Add stage labels
-    for i, stage in enumerate(stages):
-        fig.add_annotation(
-            x=i,
-            y=-0.15,
-            text=stage,
-            showarrow=False,
-            font=dict(size=12)
-        )
+        mode="markers+text",
+        marker=dict(size=30, color="#3B82F6", symbol="circle"),
+        text=[str(i + 1) for i in range(len(stages))],
+        textfont=dict(color="white", size=14),
+        hoverinfo="text",
+        hovertext=stages
+    )])
 
-    # Update layout
+    # Update layout, with the connecting line as a shape drawn below the nodes
     fig.update_layout(
         title="Research Proposal Generation Workflow",
+        shapes=[dict(
+            type="line",
+            x0=0,
+            x1=len(stages) - 1,
+            y0=0,
+            y1=0,
+            line=dict(width=3, color="#93C5FD"),
+            layer="below"
+        )],
+        annotations=_stage_labels(stages),
         showlegend=False,
         hovermode="closest",
         height=250,
@@ -89,6 +135,7 @@ def create_workflow_diagram():
     return fig
 
 
+@st.cache_data(show_spinner=False)
 def create_workflow_status(current_stage=None):
     """
     Create a visualization of the workflow status.
@@ -120,60 +167,43 @@ def create_workflow_status(current_stage=None):
     # Determine which stages are complete
     current_idx = stage_index.get(current_stage, -1)
 
-    # Create a figure
-    fig = go.Figure()
-
-    # Add nodes for each stage with appropriate colors
-    for i, stage in enumerate(stages):
+    # Color each stage (and the connection leaving it) by its status
+    colors = []
+    for i in range(len(stages)):
         if i < current_idx:  # Completed stages
-            color = "#22C55E"  # Green
+            colors.append("#22C55E")  # Green
         elif i == current_idx:  # Current stage
-            color = "#3B82F6"  # Blue
+            colors.append("#3B82F6")  # Blue
         else:  # Future stages
-            color = "#9CA3AF"  # Gray
-
-        fig.add_trace(go.Scatter(
-            x=[i],
-            y=[0],
-            mode="markers+text",
-            marker=dict(size=30, color=color, symbol="circle"),
-            text=[str(i + 1)],
-            textfont=dict(color="white", size=14),
-            name=stage,
-            hoverinfo="text",
-            hovertext=stage
-        ))
-
-    # Add connecting lines with appropriate colors
-    for i in range(len(stages) - 1):
-        if i < current_idx:  # Completed connection
-            color = "#22C55E"  # Green
-        elif i == current_idx:  # Current connection
-            color = "#3B82F6"  # Blue
-        else:  # Future connection
-            color = "#9CA3AF"  # Gray
-
-        fig.add_trace(go.Scatter(
-            x=[i, i + 1],
-            y=[0, 0],
-            mode="lines",
-            line=dict(width=3, color=color),
-            hoverinfo="skip",
-            showlegend=False
-        ))
+            colors.append("#9CA3AF")  # Gray
 
-    # Add stage labels
-    for i, stage in enumerate(stages):
-        fig.add_annotation(
-            x=i,
-            y=-0.15,
-            text=stage,
-            showarrow=False,
-            font=dict(size=12)
-        )
+    # Create a figure with all stage nodes as a single trace
+    fig = go.Figure(data=[go.Scatter(
+        x=list(range(len(stages))),
+        y=[0] * len(stages),
+        mode="markers+text",
+        marker=dict(size=30, color=colors, symbol="circle"),
+        text=[str(i + 1) for i in range(len(stages))],
+        textfont=dict(color="white", size=14),
+        hoverinfo="text",
+        hovertext=stages
+    )])
 
-    # Update layout
+    # Update layout, with connecting lines as shapes, which need no trace of their own
     fig.update_layout(
+        shapes=[
+            dict(
+                type="line",
+                x0=i,
+                x1=i + 1,
+                y0=0,
+                y1=0,
+                line=dict(width=3, color=colors[i]),
+                layer="below"
+            )
+            for i in range(len(stages) - 1)
+        ],
+        annotations=_stage_labels(stages),
         showlegend=False,
         hovermode="closest",
         height=200,
@@ -195,6 +225,67 @@ def create_workflow_status(current_stage=None):
     return fig
 
 
+def _circular_layout(n):
+    """
+    Place nodes evenly on the unit circle.
+
+    Args:
+        n (int): Number of nodes, identified as 0..n-1
+
+    Returns:
+        np.ndarray: Array of shape (n, 2) with the node positions
+    """
+    if n == 1:
+        return np.zeros((1, 2))
+
+    angles = 2 * np.pi * np.arange(n) / n
+    return np.column_stack((np.cos(angles), np.sin(angles)))
+
+
+def _spring_layout(n, edges, iterations=50, seed=42):
+    """
+    Compute a Fruchterman-Reingold force-directed layout with NumPy.
+
+    Args:
+        n (int): Number of nodes, identified as 0..n-1
+        edges (list): List of (source, target) node index pairs
+        iterations (int): Number of simulation steps
+        seed (int): Seed for the random initial positions
+
+    Returns:
+        np.ndarray: Array of shape (n, 2) with positions scaled to [-1, 1]
+    """
+    if n == 1:
+        return np.zeros((1, 2))
+
+    pos = np.random.default_rng(seed).random((n, 2))
+
+    adjacency = np.zeros((n, n))
+    for source, target in edges:
+        adjacency[source, target] = adjacency[target, source] = 1
+
+    # Optimal distance between nodes and initial "temperature"
+    k = np.sqrt(1.0 / n)
+    t = 0.1
+    dt = t / (iterations + 1)
+
+    for _ in range(iterations):
+        delta = pos[:, np.newaxis, :] - pos[np.newaxis, :, :]
+        distance = np.maximum(np.linalg.norm(delta, axis=-1), 0.01)
+        # Repulsion between all pairs, attraction along edges
+        force = k * k / distance ** 2 - adjacency * distance / k
+        displacement = np.einsum("ijk,ij->ik", delta, force)
+        length = np.maximum(np.linalg.norm(displacement, axis=-1), 0.01)
+        pos += displacement * (t / length)[:, np.newaxis]
+        t -= dt
+
+    pos -= pos.mean(axis=0)
+    scale = np.abs(pos).max()
+    if scale > 0:
+        pos /= scale
+    return pos
+
+
 def create_paper_network(papers, width=700, height=500):
     """
     Create a network visualization of the related papers.
@@ -221,69 +312,42 @@ def create_paper_network(papers, width=700, height=500):
             "size": 15  # Base size for all papers
         })
 
-    # Create edges between papers (simple connections for visualization)
-    edges = []
-    for i in range(len(nodes)):
-        for j in range(i + 1, len(nodes)):
-            # Only connect some papers to avoid clutter
-            if (i + j) % 2 == 0:
-                edges.append({
-                    "source": i,
-                    "target": j,
-                    "weight": 1
-                })
-
-    # Create a force-directed graph layout
-    import networkx as nx
-    G = nx.Graph()
-
-    # Add nodes with attributes
-    for node in nodes:
-        G.add_node(node["id"], title=node["title"], authors=node["authors"], year=node["year"])
-
-    # Add edges
-    for edge in edges:
-        G.add_edge(edge["source"], edge["target"], weight=edge["weight"])
-
-    # Calculate layout
-    pos = nx.spring_layout(G, seed=42)
-
-    # Extract node positions
-    node_x = []
-    node_y = []
-    node_text = []
-    for node_id, position in pos.items():
-        node_x.append(position[0])
-        node_y.append(position[1])
-
-        # Get node data
-        node_data = next(node for node in nodes if node["id"] == node_id)
-        hover_text = f"Title: {node_data['title']}<br>Authors: {node_data['authors']}<br>Year: {node_data['year']}"
-        node_text.append(hover_text)
-
-    # Create edges traces
-    edge_x = []
-    edge_y = []
-    for edge in edges:
-        source_pos = pos[edge["source"]]
-        target_pos = pos[edge["target"]]
-        edge_x.extend([source_pos[0], target_pos[0], None])
-        edge_y.extend([source_pos[1], target_pos[1], None])
+    # Create edges between papers (simple connections for visualization),
+    # only connecting some papers to avoid clutter
+    n = len(nodes)
+    edges = [(i, j) for i in range(n) for j in range(i + 1, n) if (i + j) % 2 == 0]
+
+    # Calculate the layout; a force-directed one only pays off beyond a few papers
+    if n <= _CIRCULAR_LAYOUT_MAX_NODES:
+        pos = _circular_layout(n)
+    else:
+        pos = _spring_layout(n, edges)
+
+    # Extract node positions; node ids are their list indices
+    node_x = pos[:, 0]
+    node_y = pos[:, 1]
+    node_text = [
+        f"Title: {node['title']}<br>Authors: {node['authors']}<br>Year: {node['year']}"
+        for node in nodes
+    ]
 
-    # Create figure
-    fig = go.Figure()
+    # Create edge segments separated by NaN gaps
+    source, target = np.array(edges, dtype=int).reshape(-1, 2).T
+    edge_x = np.full(3 * len(edges), np.nan)
+    edge_y = np.full(3 * len(edges), np.nan)
+    edge_x[0::3], edge_x[1::3] = pos[source, 0], pos[target, 0]
+    edge_y[0::3], edge_y[1::3] = pos[source, 1], pos[target, 1]
 
-    # Add edges
-    fig.add_trace(go.Scatter(
+    # Create edge and node traces
+    edge_trace = go.Scatter(
         x=edge_x, y=edge_y,
         line=dict(width=0.8, color="#CBD5E1"),
         hoverinfo="none",
         mode="lines",
         showlegend=False
-    ))
+    )
 
-    # Add nodes
-    fig.add_trace(go.Scatter(
+    node_trace = go.Scatter(
         x=node_x, y=node_y,
         mode="markers",
         marker=dict(
@@ -294,7 +358,10 @@ def create_paper_network(papers, width=700, height=500):
         text=node_text,
         hoverinfo="text",
         showlegend=False
-    ))
+    )
+
+    # Create figure
+    fig = go.Figure(data=[edge_trace, node_trace])
 
     # Update layout
     fig.update_layout(
@@ -332,57 +399,27 @@ def create_methodology_comparison(proposals):
     if not proposals:
         return None
 
-    # Define methodology categories for comparison
-    categories = [
-        "Data Collection",
-        "Computational Methods",
-        "Experimental Design",
-        "Analysis Techniques",
-        "Validation Approaches"
-    ]
-
     # For each proposal, score each category from 0-5 based on keyword presence
     # (This is a simplified approach - in a real system, you would use NLP)
-    data = []
+    traces = []
     for i, proposal in enumerate(proposals):
         methodology = proposal.get("methodology", "").lower()
 
-        # Simple keyword-based scoring
-        keywords = {
-            "Data Collection": ["survey", "interview", "dataset", "corpus", "collection"],
-            "Computational Methods": ["algorithm", "computation", "model", "simulation", "neural"],
-            "Experimental Design": ["experiment", "control", "variable", "trial", "condition"],
-            "Analysis Techniques": ["analysis", "statistical", "regression", "correlation", "significance"],
-            "Validation Approaches": ["validation", "accuracy", "precision", "recall", "evaluation"]
-        }
-
-        scores = []
-        for category, words in keywords.items():
-            score = 0
-            for word in words:
-                if word in methodology:
-                    score += 1
-            scores.append(min(5, score))  # Cap at 5
-
-        data.append({
-            "Proposal": proposal.get("proposal_title", f"Proposal {i + 1}"),
-            **{category: score for category, score in zip(categories, scores)}
-        })
-
-    # Create a DataFrame
-    df = pd.DataFrame(data)
-
-    # Create radar chart
-    fig = go.Figure()
+        # Count the distinct keywords of each category found in the text
+        scores = [
+            min(5, len(set(_METHODOLOGY_PATTERNS[category].findall(methodology))))  # Cap at 5
+            for category in _METHODOLOGY_CATEGORIES
+        ]
 
-    for i, row in df.iterrows():
-        fig.add_trace(go.Scatterpolar(
-            r=row[categories].values.tolist(),
-            theta=categories,
+        traces.append(go.Scatterpolar(
+            r=scores,
+            theta=_METHODOLOGY_CATEGORIES,
             fill="toself",
-            name=row["Proposal"]
+            name=proposal.get("proposal_title", f"Proposal {i + 1}")
         ))
 
+    fig = go.Figure(data=traces)
+
     fig.update_layout(
         polar=dict(
             radialaxis=dict(
@@ -411,68 +448,42 @@ def create_timeline_visualization(proposals):
     if not proposals:
         return None
 
-    # Extract timeline data from proposals
+    # Extract timeline data from proposals, grouped by phase
     # This is a simplified approach - in a real system, you would use NLP to parse timelines
-    tasks = []
+    phases = {}
 
     for i, proposal in enumerate(proposals):
         title = proposal.get("proposal_title", f"Proposal {i + 1}")
         timeline = proposal.get("timeline", "")
 
-        # Simple parsing for timeline phases
-        # Look for patterns like "Phase 1 (Month 1-3): Description"
-        import re
-
-        # Fallback timeline if parsing fails
-        default_tasks = [
-            {"phase": "Literature Review", "start": 1, "end": 2},
-            {"phase": "Data Collection", "start": 2, "end": 5},
-            {"phase": "Analysis", "start": 5, "end": 8},
-            {"phase": "Validation", "start": 8, "end": 10},
-            {"phase": "Documentation", "start": 10, "end": 12}
-        ]
-
-        # Try to parse the timeline
-        parsed_tasks = []
-
-        # Simple regex to find time periods
-        pattern = r"(Phase \d+|[^:.(]+).*?(\d+)[-–](\d+).*?(?:month|months|week|weeks)"
-        matches = re.findall(pattern, timeline, re.IGNORECASE)
-
-        if matches:
-            for match in matches:
-                phase = match[0].strip()
-                start = int(match[1])
-                end = int(match[2])
-                parsed_tasks.append({"phase": phase, "start": start, "end": end})
-
-        # Use parsed tasks or default
-        proposal_tasks = parsed_tasks if parsed_tasks else default_tasks
-
-        # Add to overall tasks list
-        for task in proposal_tasks:
-            tasks.append({
-                "Proposal": title,
-                "Phase": task["phase"],
-                "Start": task["start"],
-                "End": task["end"]
-            })
-
-    # Create DataFrame
-    df = pd.DataFrame(tasks)
-
-    # Create Gantt chart
-    fig = px.timeline(
-        df,
-        x_start="Start",
-        x_end="End",
-        y="Proposal",
-        color="Phase",
-        title="Research Timeline Comparison"
-    )
+        # Try to parse the timeline, falling back to the default one
+        proposal_tasks = [
+            (match["phase"].strip(), int(match["start"]), int(match["end"]))
+            for match in _TIMELINE_RE.finditer(timeline)
+        ] or _DEFAULT_TIMELINE
+
+        for phase, start, end in proposal_tasks:
+            bars = phases.setdefault(phase, {"y": [], "base": [], "x": []})
+            bars["y"].append(title)
+            bars["base"].append(start)
+            bars["x"].append(end - start)
+
+    # Create Gantt chart with one horizontal bar trace per phase
+    fig = go.Figure(data=[
+        go.Bar(
+            name=phase,
+            orientation="h",
+            y=bars["y"],
+            base=bars["base"],
+            x=bars["x"]
+        )
+        for phase, bars in phases.items()
+    ])
 
     # Update layout
     fig.update_layout(
+        title="Research Timeline Comparison",
+        barmode="overlay",
         xaxis_title="Months",
         yaxis_title="",
         height=300 + (len(proposals) * 50),
@@ -485,6 +496,38 @@ def create_timeline_visualization(proposals):
     return fig
 
 
+@st.cache_data(show_spinner=False)
+def _render_wordcloud_png(text, stopwords):
+    """
+    Render a word cloud of the given text as PNG bytes.
+
+    Cached on the text itself, so reruns with unchanged proposals skip the
+    word cloud layout entirely.
+
+    Args:
+        text (str): Text to build the word cloud from
+        stopwords (frozenset): Words to leave out
+
+    Returns:
+        bytes: PNG image data
+    """
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(
+        width=800,
+        height=400,
+        background_color="white",
+        stopwords=stopwords,
+        max_words=100,
+        contour_width=3,
+        contour_color="steelblue"
+    ).generate(text)
+
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
 def display_proposal_statistics(proposals):
     """
     Display statistics about the generated proposals.
@@ -503,48 +546,37 @@ def display_proposal_statistics(proposals):
     with col1:
         st.metric("Total Proposals", len(proposals))
 
+    # Total methodology length and research questions in a single pass
+    methodology_length = question_count = 0
+    for p in proposals:
+        methodology_length += len(p.get("methodology", ""))
+        question_count += len(p.get("research_questions", ()))
+
     # Calculate average methodology length
-    avg_methodology_length = sum(len(p.get("methodology", "")) for p in proposals) / len(proposals)
+    avg_methodology_length = methodology_length / len(proposals)
     with col2:
         st.metric("Avg. Methodology Length", f"{int(avg_methodology_length)} chars")
 
     # Calculate average number of research questions
-    avg_questions = sum(len(p.get("research_questions", [])) for p in proposals) / len(proposals)
+    avg_questions = question_count / len(proposals)
     with col3:
         st.metric("Avg. Research Questions", f"{avg_questions:.1f}")
 
     # Create a word cloud of the most common terms
     try:
-        from wordcloud import WordCloud
-        import matplotlib.pyplot as plt
-
         # Combine all text from proposals
-        all_text = " ".join([
+        all_text = " ".join(
             p.get("introduction", "") + " " +
             p.get("methodology", "") + " " +
             p.get("expected_outcomes", "")
             for p in proposals
-        ])
-
-        # Create word cloud
-        stopwords = {"the", "and", "to", "of", "a", "in", "that", "is", "for", "this", "will", "be", "on", "an", "with",
-                     "as"}
-        wordcloud = WordCloud(
-            width=800,
-            height=400,
-            background_color="white",
-            stopwords=stopwords,
-            max_words=100,
-            contour_width=3,
-            contour_color="steelblue"
-        ).generate(all_text)
+        )
+
+        png = _render_wordcloud_png(all_text, _WORDCLOUD_STOPWORDS)
 
         # Display word cloud
         st.markdown("### Key Terms in Proposals")
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.imshow(wordcloud, interpolation='bilinear')
-        ax.axis("off")
-        st.pyplot(fig)
+        st.image(png)
 
     except ImportError:
-        st.info("Install wordcloud package for term visualization")
\ No newline at end of file
+        st.info("Install wordcloud package for term visualization")